@@ -0,0 +1,320 @@
+'''
+Benchmarks of the helperhandler hot paths - dataset loading, rolling origin backtests,
+residual diagnostics, synthetic scale-up series (to expose super-linear behaviour) & the
+cold import of the package.
+
+The classes follow the asv conventions (`params`, `setup`, `time_*`), so they can be run by
+asv as they are, or standalone, from anywhere:
+
+    python Notebooks/benchmarks/bench_helperhandler.py [-k sunspots] [--quick] [--save run.csv]
+                                                      [--compare baseline.csv]
+
+The standalone runner reports the best/median wall time over `--repeat` runs & the peak traced
+(Python) memory of one extra run under `tracemalloc`, and for the scale-up benchmarks the time
+per point. `--compare` adds the ratio to a previously `--save`d run.
+'''
+import os
+import sys
+import time
+import atexit
+import shutil
+import tempfile
+import argparse
+import importlib.util
+import subprocess
+import tracemalloc
+import numpy as np
+import pandas as pd
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+
+_notebooks_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _import_helperhandler():
+    # Loaded from its directory (the package is not installed), without touching `sys.path` or
+    # the working directory of whoever imports the benchmarks (e.g asv collecting them)
+    if 'helperhandler' not in sys.modules:
+        spec = importlib.util.spec_from_file_location('helperhandler',
+                                                      os.path.join(_notebooks_dir, 'helperhandler', '__init__.py'))
+        module = importlib.util.module_from_spec(spec)
+        sys.modules['helperhandler'] = module
+        spec.loader.exec_module(module)
+    return sys.modules['helperhandler']
+
+
+_import_helperhandler()
+from helperhandler import dataHolder, ro_framework, residual_diagnostic, origin_schedule
+from helperhandler import residual_diagnostic_batch, residual_stats
+from helperhandler import compute_metrics, get_metrics, lag_feature_matrix
+from statsmodels.tsa.ar_model import AutoReg
+from statsmodels.tsa.arima.model import ARIMA
+
+# Shrunk by `--quick`
+_settings = {'cv_window': 48, 'scale_sizes': [10_000, 100_000, 1_000_000]}
+# Temporary home of the prepared copies, the repository's `Prepared Data` is left alone
+_prepared_dir = None
+
+
+############################## DATA ##############################
+def _enter_datasets():
+    # The datasets are read relative to the Notebooks directory, as from the notebooks. Called by
+    # the `setup` of the benchmarks using them, returns the working directory to restore after.
+    global _prepared_dir
+    if _prepared_dir is None:
+        _prepared_dir = tempfile.mkdtemp(prefix='bench_prepared_')
+        atexit.register(shutil.rmtree, _prepared_dir, True)
+        for dpc in dataHolder.bucket.values():
+            if dpc.prepared_path is not None:
+                dpc.prepared_path = os.path.join(_prepared_dir, os.path.basename(dpc.prepared_path))
+    cwd = os.getcwd()
+    os.chdir(_notebooks_dir)
+    return cwd
+
+
+def _modelling_data(key):
+    # The series as modelled in the notebooks, with a regular frequency
+    data = dataHolder[key]
+    if key == 'airp_data':
+        data = data.asfreq('MS')
+    elif key == 'sunspots':
+        data = np.cbrt(data).asfreq('M')
+    elif key == 'brit_stock':
+        data = data[['Close']].asfreq('B').ffill()
+    return data
+
+
+def _backtest_params(key):
+    data = _modelling_data(key)
+    test_start = data.index[int(len(data)*0.9)]
+    offset, offset_freq = {'airp_data': (pd.DateOffset(months=1), 'months'),
+                           'sunspots': (pd.DateOffset(months=1), 'months'),
+                           'brit_stock': (pd.DateOffset(days=1), 'days')}[key]
+    cv_window = min(_settings['cv_window'], int((data.index < test_start).sum()*0.5)-1)
+    return dict(data=data, target_col=data.columns[0], feature_cols=[], test_start=test_start,
+                cv_window=cv_window, ahead_offest=offset, ahead_offest_freq=offset_freq,
+                test_predict=False, metric='MAPE', debug=False)
+
+
+def _random_walk(n, freq='min'):
+    rng = np.random.default_rng(0)
+    index = pd.date_range('2000-01-01', periods=n, freq=freq)
+    return pd.DataFrame({'y': 100+np.cumsum(rng.normal(size=n))}, index=index)
+
+
+def _prophet_generator():
+    try:
+        from prophet import Prophet
+    except ImportError:
+        from fbprophet import Prophet
+
+    class ProphetObjectGenerator:
+        def get_pmodelinstance(self):
+            return Prophet(weekly_seasonality=False, daily_seasonality=False)
+        def fit(self):
+            pass
+        def predict(self):
+            pass
+    return ProphetObjectGenerator()
+
+
+
+############################## BENCHMARKS ##############################
+class LoadData:
+    # Processing of every dataset from its raw file, and from its prepared (binary) copy
+    params = list(dataHolder.keys())
+    param_names = ['key']
+
+    def setup(self, key):
+        self._cwd = _enter_datasets()
+        self.dpc = dataHolder.bucket[key]
+        # Make sure a prepared copy exists for `time_load_prepared`
+        self.dpc.run_processingfunc(use_prepared=True)
+
+    def teardown(self, key):
+        os.chdir(self._cwd)
+
+    def time_load_raw(self, key):
+        self.dpc.run_processingfunc(use_prepared=False)
+
+    def time_load_prepared(self, key):
+        self.dpc.run_processingfunc(use_prepared=True)
+
+
+class Backtest:
+    # CV rolls of representative configurations on the bundled datasets
+    params = ['airp_data-ARIMA', 'airp_data-Prophet', 'sunspots-AutoReg', 'sunspots-ARIMA',
+              'brit_stock-ARIMA', 'brit_stock-AutoReg']
+    param_names = ['config']
+
+    def setup(self, config):
+        key, model = config.split('-')
+        if model == 'ARIMA':
+            model_kwargs = dict(model=ARIMA, model_params={'order': (2, 1, 1)})
+        elif model == 'AutoReg':
+            model_kwargs = dict(model=AutoReg, model_params={'lags': [1, 3, 5, 18]})
+        else:
+            try:
+                model_kwargs = dict(model=_prophet_generator())
+            except ImportError:
+                raise NotImplementedError('prophet is not installed')
+        self._cwd = _enter_datasets()
+        self.kwargs = dict(_backtest_params(key), **model_kwargs)
+
+    def time_cv_roll(self, config):
+        ro_framework(**self.kwargs)
+
+    def teardown(self, config):
+        os.chdir(self._cwd)
+
+
+class Diagnostics:
+    # Residual diagnostic figure of a finished backtest
+    params = ['airp_data', 'sunspots', 'brit_stock']
+    param_names = ['key']
+
+    def setup(self, key):
+        self._cwd = _enter_datasets()
+        self.out_dir = tempfile.mkdtemp()
+        kwargs = _backtest_params(key)
+        # MAE, as the sunspots are 0 in some months (infinite MAPE)
+        kwargs.update(model=AutoReg, model_params={'lags': [1, 2, 3]}, test_predict=True, test_roll=True,
+                      metric='MAE')
+        self.respack = ro_framework(**kwargs)
+        data = kwargs['data']
+        self.training_target = data[data.index < kwargs['test_start']][kwargs['target_col']]
+
+    def time_residual_diagnostic(self, key):
+        residual_diagnostic(self.respack, self.training_target)
+        plt.close('all')
+
+    def time_residual_diagnostic_batch(self, key):
+        residual_diagnostic_batch({key: self.respack}, self.training_target, out_dir=self.out_dir)
+
+    def time_residual_stats(self, key):
+        residual_stats(self.respack)
+
+    def teardown(self, key):
+        shutil.rmtree(self.out_dir, ignore_errors=True)
+        os.chdir(self._cwd)
+
+
+class ScaleUp:
+    # Synthetic random walks of growing length, the time per point should stay flat
+    params = [10_000, 100_000, 1_000_000]
+    param_names = ['n']
+
+    def setup(self, n):
+        self.data = _random_walk(n)
+        self.metrics = get_metrics(['MAPE', 'sMAPE', 'RMSE', 'MAE'])
+        self.kwargs = dict(data=self.data, model=AutoReg, model_params={'lags': 3}, target_col='y',
+                           feature_cols=[], test_start=self.data.index[-20], cv_window=10,
+                           ahead_offest=pd.DateOffset(minutes=1), ahead_offest_freq='minutes')
+
+    def time_origin_schedule(self, n):
+        origin_schedule(self.data.index, self.data.index[n//2:], pd.DateOffset(minutes=1), horizons=5)
+
+    def time_debug_schedule(self, n):
+        ro_framework(debug=True, **dict(self.kwargs, cv_window=n//4, test_start=self.data.index[n//2]))
+
+    def time_compute_metrics(self, n):
+        y = self.data.y.values
+        compute_metrics(self.metrics, y, y[::-1], {})
+
+    def time_lag_feature_matrix(self, n):
+        lag_feature_matrix(self.data, 'y', lags=(1, 2, 3, 60), windows=(60,))
+
+    def time_cv_roll(self, n):
+        ro_framework(debug=False, **self.kwargs)
+
+
+
+class ImportTime:
+    # Cold imports, each in a fresh interpreter ('python' being the interpreter start-up alone)
+    params = ['python', 'helperhandler', 'helperhandler+dataHolder', 'helperhandler+plotting']
+    param_names = ['target']
+    _code = {'python': 'pass',
+             'helperhandler': 'import helperhandler',
+             'helperhandler+dataHolder': 'from helperhandler import dataHolder',
+             'helperhandler+plotting': 'import helperhandler as hh; hh.plt.figure; hh.sns.distplot'}
+
+    def setup(self, target):
+        pass
+
+    def time_cold_import(self, target):
+        subprocess.run([sys.executable, '-c', self._code[target]], cwd=_notebooks_dir, check=True,
+                       env=dict(os.environ, MPLBACKEND='Agg'))
+
+
+
+############################## STANDALONE RUNNER ##############################
+_benchmarks = [LoadData, Backtest, Diagnostics, ScaleUp, ImportTime]
+
+
+def _measure(func, repeat):
+    times = []
+    for _ in range(repeat):
+        _start = time.perf_counter()
+        func()
+        times.append(time.perf_counter()-_start)
+    tracemalloc.start()
+    try:
+        func()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return min(times), float(np.median(times)), peak/1024**2
+
+
+def run(pattern=None, repeat=3):
+    rows = []
+    for bench_cls in _benchmarks:
+        for name in sorted(k for k in dir(bench_cls) if k.startswith('time_')):
+            for param in bench_cls.params:
+                if bench_cls is ScaleUp and param not in _settings['scale_sizes']:
+                    continue
+                label = '{0}.{1}({2})'.format(bench_cls.__name__, name, param)
+                if pattern and pattern not in label:
+                    continue
+                row = {'Benchmark': label, 'Best': np.nan, 'Median': np.nan, 'Peak MB': np.nan,
+                       'Per Point us': np.nan, 'Status': 'OK'}
+                bench, ready = bench_cls(), False
+                try:
+                    bench.setup(param)
+                    ready = True
+                    row['Best'], row['Median'], row['Peak MB'] = _measure(lambda: getattr(bench, name)(param), repeat)
+                    if type(param) == int:
+                        row['Per Point us'] = row['Best']/param*1e6
+                except NotImplementedError as e:
+                    row['Status'] = 'Skipped: {}'.format(e)
+                except Exception as e:
+                    row['Status'] = 'Failed: {0}: {1}'.format(type(e).__name__, e)
+                finally:
+                    # Restores the working directory, also after a failed run
+                    if ready and hasattr(bench, 'teardown'):
+                        bench.teardown(param)
+                print('{0:<60} {1:>10.4f}s {2:>10.1f}MB  {3}'.format(label, row['Best'], row['Peak MB'], row['Status']))
+                rows.append(row)
+    return pd.DataFrame(rows).set_index('Benchmark')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='helperhandler benchmarks')
+    parser.add_argument('-k', dest='pattern', default=None, help='only the benchmarks containing this text')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--quick', action='store_true', help='small CV windows & scale-up sizes')
+    parser.add_argument('--save', default=None, help='write the results to this csv')
+    parser.add_argument('--compare', default=None, help='csv of a previous run to compare against')
+    args = parser.parse_args()
+
+    if args.quick:
+        _settings.update(cv_window=12, scale_sizes=[10_000, 100_000])
+    results = run(args.pattern, args.repeat)
+    if args.compare:
+        baseline = pd.read_csv(args.compare, index_col=0)
+        results['vs Baseline'] = results['Best']/baseline['Best'].reindex(results.index)
+    with pd.option_context('display.width', 200, 'display.max_rows', None, 'display.max_columns', None):
+        print(results.drop(columns='Status'))
+    if args.save:
+        results.to_csv(args.save)
@@ -1,20 +1,62 @@
-from ._databucket import dataHolder
+from ._metrics import register_metric
+from ._metrics import get_metrics, metrics_need, compute_metrics, aggregate_metric, seasonal_naive_scale
+from ._metrics import RunningAggregate
+from ._cache import ForecastCache, _model_token
+from ._features import lag_feature_matrix, _default_feature_params
+from ._diagnostics import residual_stats, residual_diagnostic_batch
+from ._profiling import OriginProfiler, _null_timer
+from ._individual_funcs import dense_panel
+from ._readers import ChunkedReader, HorizonsReader
 
 import os
 import copy
 import numpy as np
 import pandas as pd
-import seaborn as sns
-from tqdm.notebook import tqdm
-import matplotlib.pyplot as plt
-from IPython.display import display
+from inspect import signature, isclass
+from functools import partial
 from warnings import filterwarnings
-from statsmodels.tsa.stattools import kpss
-from statsmodels.tsa.stattools import adfuller
-from statsmodels.graphics.gofplots import qqplot
-from statsmodels.graphics.tsaplots import plot_acf
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from ._lazy import LazyModule, lazy_callable, tqdm
 
-filterwarnings('ignore')
+def _ignore_warnings(module=None):
+    # statsmodels registers `simplefilter('always', ...)` for its warnings (ConvergenceWarning,
+    # InterpolationWarning ...) when first imported, which takes precedence over an earlier ignore.
+    # So the ignore is re-applied once statsmodels is loaded (lazily, or by the caller's models).
+    filterwarnings('ignore')
+
+# Imported on first use
+sns = LazyModule('seaborn')
+plt = LazyModule('matplotlib.pyplot')
+kpss = lazy_callable('statsmodels.tsa.stattools', 'kpss', on_load=_ignore_warnings)
+adfuller = lazy_callable('statsmodels.tsa.stattools', 'adfuller', on_load=_ignore_warnings)
+STL = lazy_callable('statsmodels.tsa.seasonal', 'STL', on_load=_ignore_warnings)
+seasonal_decompose = lazy_callable('statsmodels.tsa.seasonal', 'seasonal_decompose', on_load=_ignore_warnings)
+qqplot = lazy_callable('statsmodels.graphics.gofplots', 'qqplot', on_load=_ignore_warnings)
+plot_acf = lazy_callable('statsmodels.graphics.tsaplots', 'plot_acf', on_load=_ignore_warnings)
+
+_ignore_warnings()
+
+
+def __getattr__(name):
+    # The dataset registry (& its processing/plotting functions) is only imported when first used
+    if name == 'dataHolder':
+        from ._databucket import dataHolder
+        globals()['dataHolder'] = dataHolder
+        return dataHolder
+    raise AttributeError(f"module '{__name__}' has no attribute '{name}'")
+
+
+def __dir__():
+    return sorted(list(globals())+['dataHolder'])
+
+# 'cold' - refit from scratch at every origin
+# 'warm' - append the new observations to the previous results & refit starting from its params
+# 'filter' - append the new observations keeping the params fixed, i.e only re-run the filter
+# Prophet models can only be fitted once, 'warm' starts their optimizer from the previous fit's params
+# scikit-learn models are always refitted 'cold', 'filter' is statsmodels only
+_refit_modes = ['cold', 'warm', 'filter']
+# Integer positions of an `origin_schedule`, i.e data.iloc[begin:stop] slices
+_window_cols = ['Train Begin', 'Train Stop', 'Pred Begin', 'Pred Stop']
 
 def get_ts_strength(decomp_obj):
     
@@ -22,31 +64,142 @@ def get_ts_strength(decomp_obj):
     st = decomp_obj.seasonal
     rt = decomp_obj.resid
     
-    trend_strength = np.var(rt)/np.var(tt+rt)
-    trend_strength = max([0, 1-trend_strength])
-
-    seasonal_strength = np.var(rt)/np.var(st+rt)
-    seasonal_strength = max([0, 1-seasonal_strength])
+    trend_strength, seasonal_strength = _component_strengths(np.atleast_2d(tt), np.atleast_2d(st),
+                                                             np.atleast_2d(rt))
     
-    sdf = pd.DataFrame([trend_strength, seasonal_strength],
+    sdf = pd.DataFrame([trend_strength[0], seasonal_strength[0]],
                          columns=['Strength'], index=['Trend', 'Seasonal'])
     
     return sdf
 
+def get_ts_strength_panel(data, period, id_col=None, value_col=None, method='stl', n_jobs=1, **decomp_kwargs):
+    # Trend & seasonal strength of every series of a wide or long frame (see `adf_test_batch`),
+    # one row per series. Series are decomposed (`method` - 'stl' or 'classical') across
+    # `n_jobs` workers, the strengths are computed at once over the stacked components.
+    if method not in ['stl', 'classical']:
+        raise ValueError("'method' should be one of ['stl', 'classical']")
+    panel = _panel_series(data, id_col, value_col)
+    func = partial(_decompose_components, period=period, method=method, **decomp_kwargs)
+    if n_jobs == 1 or len(panel) < 2:
+        components = list(map(func, panel.values()))
+    else:
+        n_jobs = os.cpu_count() if n_jobs == -1 else n_jobs
+        with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+            components = list(executor.map(func, panel.values(), chunksize=max(1, len(panel)//(n_jobs*4))))
+    
+    # (series x time) arrays, shorter series padded with NaN
+    max_len = max([len(v) for v in panel.values()], default=0)
+    stacked = np.full((3, len(panel), max_len), np.nan)
+    for i, comps in enumerate(components):
+        stacked[:, i, :comps.shape[1]] = comps
+    
+    trend_strength, seasonal_strength = _component_strengths(*stacked)
+    return pd.DataFrame({'Trend': trend_strength, 'Seasonal': seasonal_strength},
+                        index=pd.Index(list(panel), name='Series'))
+
+def _decompose_components(timeseries, period, method='stl', **decomp_kwargs):
+    # (trend, seasonal, resid) as a 3 x len(timeseries) array, all NaN when not decomposable
+    try:
+        if method == 'stl':
+            decomp_obj = STL(timeseries, period=period, **decomp_kwargs).fit()
+        else:
+            decomp_obj = seasonal_decompose(timeseries, period=period, **decomp_kwargs)
+    except (ValueError, np.linalg.LinAlgError):
+        return np.full((3, len(timeseries)), np.nan)
+    return np.vstack([decomp_obj.trend, decomp_obj.seasonal, decomp_obj.resid])
+
+def _component_strengths(tt, st, rt):
+    # Row-wise (one series per row) strengths, NaNs ignored
+    tt, st, rt = [np.asarray(k, dtype=np.float64) for k in (tt, st, rt)]
+    trend_strength = np.maximum(0, 1-np.nanvar(rt, axis=1)/np.nanvar(tt+rt, axis=1))
+    seasonal_strength = np.maximum(0, 1-np.nanvar(rt, axis=1)/np.nanvar(st+rt, axis=1))
+    return trend_strength, seasonal_strength
+
 def adf_test(timeseries, autolag='AIC',**kwargs):
+    return pd.Series(_adf_row(timeseries, autolag=autolag, **kwargs)).to_frame()
+
+def kpss_test(timeseries, regression='c', nlags="auto", **kwargs):
+    return pd.Series(_kpss_row(timeseries, regression=regression, nlags=nlags, **kwargs)).to_frame()
+
+def _adf_row(timeseries, autolag='AIC', **kwargs):
     dftest = adfuller(timeseries, autolag=autolag, **kwargs)
-    df = pd.Series(dftest[0:4],
-                   index=['Test Statistic','p-value','#Lags Used','Number of Observations Used'])
+    row = dict(zip(['Test Statistic','p-value','#Lags Used','Number of Observations Used'], dftest[0:4]))
     for key,value in dftest[4].items():
-        df['Critical Value (%s)'%key] = value
-    return df.to_frame()
+        row['Critical Value (%s)'%key] = value
+    return row
 
-def kpss_test(timeseries, regression='c', nlags="auto", **kwargs):
+def _kpss_row(timeseries, regression='c', nlags="auto", **kwargs):
     kpsstest = kpss(timeseries, regression=regression, nlags=nlags, **kwargs)
-    kpss_output = pd.Series(kpsstest[0:3], index=['Test Statistic','p-value','Lags Used'])
+    row = dict(zip(['Test Statistic','p-value','Lags Used'], kpsstest[0:3]))
     for key,value in kpsstest[3].items():
-        kpss_output['Critical Value (%s)'%key] = value
-    return kpss_output.to_frame()
+        row['Critical Value (%s)'%key] = value
+    return row
+
+
+def adf_test_batch(data, id_col=None, value_col=None, autolag='AIC', n_jobs=1, shared_autolag=False, **kwargs):
+    # ADF test of every series of a wide frame (one series per column) or of a long frame
+    # (one series per `id_col` group), one row per series.
+    # `shared_autolag` runs the autolag search once per group of equal length series (on its
+    # first testable series) and tests the rest of the group with that lag, skipping their searches.
+    # An approximation - the borrowed lag is not the series' own AIC choice, so their statistics &
+    # p-values differ from a per-series autolag ADF. 'Lag From' names the series whose search set the lag.
+    panel = _panel_series(data, id_col, value_col)
+    if not (shared_autolag and autolag):
+        return _batch_test(_adf_row, panel, n_jobs, autolag=autolag, **kwargs)
+    
+    lengths = pd.Series({k: len(v) for k, v in panel.items()})
+    results = []
+    for _, group in lengths.groupby(lengths):
+        # Untestable series (constant, all NaN ...) get an empty row & the next one leads, a group
+        # without any testable series is searched series by series
+        lag_kwargs, lag_from = dict(kwargs, autolag=autolag), None
+        n_searched = 0
+        for lead in group.index:
+            lead_result = _batch_test(_adf_row, {lead: panel[lead]}, 1, autolag=autolag, **kwargs)
+            results.append(lead_result.assign(**{'Lag From': lead}))
+            n_searched += 1
+            if '#Lags Used' in lead_result.columns and not np.isnan(lead_result['#Lags Used'].iloc[0]):
+                lag_kwargs = dict(kwargs, autolag=None, maxlag=int(lead_result['#Lags Used'].iloc[0]))
+                lag_from = lead
+                break
+        rest = {k: panel[k] for k in group.index[n_searched:]}
+        rest_result = _batch_test(_adf_row, rest, n_jobs, **lag_kwargs)
+        results.append(rest_result.assign(**{'Lag From': rest_result.index if lag_from is None else lag_from}))
+    return pd.concat(results).loc[list(panel)]
+
+def kpss_test_batch(data, id_col=None, value_col=None, regression='c', nlags="auto", n_jobs=1, **kwargs):
+    # KPSS test of every series of a wide or long frame, see `adf_test_batch`
+    panel = _panel_series(data, id_col, value_col)
+    return _batch_test(_kpss_row, panel, n_jobs, regression=regression, nlags=nlags, **kwargs)
+
+def _panel_series(data, id_col=None, value_col=None):
+    # {series id: NaN-free values} from a wide (id_col=None) or a long frame
+    if id_col is None:
+        return {k: data[k].dropna().values for k in data.columns}
+    if value_col is None:
+        value_cols = [k for k in data.columns if k != id_col]
+        if len(value_cols) != 1:
+            raise ValueError(f"'value_col' should be one of {value_cols}")
+        value_col = value_cols[0]
+    return {k: v.dropna().values for k, v in data.groupby(id_col, sort=False, observed=True)[value_col]}
+
+def _batch_test(row_func, panel, n_jobs=1, **kwargs):
+    func = partial(_safe_row, row_func, **kwargs)
+    if n_jobs == 1 or len(panel) < 2:
+        rows = list(map(func, panel.values()))
+    else:
+        n_jobs = os.cpu_count() if n_jobs == -1 else n_jobs
+        with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+            rows = list(executor.map(func, panel.values(), chunksize=max(1, len(panel)//(n_jobs*4))))
+    results = pd.DataFrame(rows, index=pd.Index(list(panel), name='Series'))
+    return results
+
+def _safe_row(row_func, timeseries, **kwargs):
+    # A series that can not be tested (too short, constant ...) gets an empty row
+    try:
+        return row_func(timeseries, **kwargs)
+    except (ValueError, np.linalg.LinAlgError):
+        return {}
 
 
 # https://github.com/facebook/prophet/issues/223#issuecomment-326455744
@@ -61,23 +214,49 @@ class suppress_stdout_stderr(object):
 
     '''
     def __init__(self):
-        # Open a pair of null files
-        self.null_fds = [os.open(os.devnull, os.O_RDWR) for x in range(2)]
-        # Save the actual stdout (1) and stderr (2) file descriptors.
-        self.save_fds = [os.dup(1), os.dup(2)]
+        # The fds are only opened on `open()` or when entering, so nothing can leak from here
+        self.null_fds, self.save_fds = None, None
+        self._owned = False
+        self._depth = 0
+
+    def open(self):
+        # Open once & keep until `close()`, so that one instance can wrap every fit of a backtest
+        if self.null_fds is None:
+            # Open a pair of null files
+            self.null_fds = [os.open(os.devnull, os.O_RDWR) for x in range(2)]
+            # Save the actual stdout (1) and stderr (2) file descriptors.
+            self.save_fds = [os.dup(1), os.dup(2)]
+        return self
+
+    def close(self):
+        # Close the null files
+        if self.null_fds is not None:
+            for fd in self.null_fds + self.save_fds:
+                os.close(fd)
+        self.null_fds, self.save_fds = None, None
 
     def __enter__(self):
-        # Assign the null pointers to stdout and stderr.
-        os.dup2(self.null_fds[0], 1)
-        os.dup2(self.null_fds[1], 2)
+        if self._depth == 0:
+            # Used as a one-off context, the fds live only as long as the `with` block
+            self._owned = self.null_fds is None
+            self.open()
+            # Assign the null pointers to stdout and stderr.
+            os.dup2(self.null_fds[0], 1)
+            os.dup2(self.null_fds[1], 2)
+        self._depth += 1
+        return self
 
     def __exit__(self, *_):
-        # Re-assign the real stdout/stderr back to (1) and (2)
-        os.dup2(self.save_fds[0], 1)
-        os.dup2(self.save_fds[1], 2)
-        # Close the null files
-        for fd in self.null_fds + self.save_fds:
-            os.close(fd)
+        self._depth -= 1
+        if self._depth == 0:
+            # Re-assign the real stdout/stderr back to (1) and (2)
+            os.dup2(self.save_fds[0], 1)
+            os.dup2(self.save_fds[1], 2)
+            if self._owned:
+                self.close()
+
+    def __del__(self):
+        self.close()
 
 
 
@@ -87,8 +266,26 @@ def ro_framework(data, model,
                  test_start, cv_window, ahead_offest,
                  test_predict=False, test_roll=False,
                  model_params=None,
-                 metric='MAPE', debug=True, ahead_offest_freq='days',back_transform_func=None):
+                 metric='MAPE', debug=True, ahead_offest_freq='days',back_transform_func=None,
+                 n_jobs=1, executor=None, refit_mode='cold', horizons=None, metric_params=None,
+                 cache=None, id_col=None, feature_params=None, train_window=None, refit_every=1,
+                 profile=None, cache_key=None):
     # Three libraries - statsmodels, sklearn, prophet
+    # sklearn models are fitted on lag/rolling/calendar features, configured by `feature_params`
+    # `train_window` - fixed number of training rows (sliding window), None for an expanding window
+    # `horizons` - forecast the path of `horizons` observations at every origin, horizon 1 being the origin
+    #   itself (`ahead_offest` after the cutoff); origins sharing a training cutoff are only forecasted once
+    # `refit_every` - refit at every k-th origin only, the origins in between reuse the last fitted model
+    # `n_jobs`/`executor` - the origins are fitted in contiguous chunks, one chunk per worker task, and every
+    #   chunk starts with a cold fit. `refit_every` blocks never straddle two chunks, so they refit at the
+    #   same origins as a sequential roll, but the 'warm'/'filter' chains restart at every chunk: which
+    #   origins are fitted cold depends on the number of chunks, the results only match a sequential roll
+    #   when the fits are deterministic. Use `n_jobs=1` for reproducible warm/filter chains.
+    # `cache_key` - the model's identity in the `cache`, needed when it can not be derived from its configuration
+    # Panel mode - with `id_col`, `data` is a long frame holding one series per `id_col` value
+    #   series that can not be backtested (too short, off frequency) are skipped, see 'Status' in the overall sheet
+    # `profile` - an `OriginProfiler` collecting the per-origin timings (`profile.to_frame()` once done),
+    #   or a callback called with every timing record
     
     # Checks
     _tfreq = ['years', 'months', 'weeks', 'days', 'hours', 'minutes',
@@ -103,7 +300,7 @@ def ro_framework(data, model,
         raise ValueError("Data should be having index of type 'pd.DatetimeIndex'")
     if not (type(test_start) == str or type(test_start) == pd._libs.tslibs.timestamps.Timestamp):
         raise ValueError("'test_start' should be a 'pd.Timestamp' or 'str'")
-    if not (pd.to_datetime(test_start)>data.index[0] and pd.to_datetime(test_start)<data.index[-1]):
+    if not (pd.to_datetime(test_start)>data.index.min() and pd.to_datetime(test_start)<data.index.max()):
         raise ValueError("'test_start' should be in between {0} and {1}".format(data.index.min(),
                                                                                 data.index.max()))
     if not type(ahead_offest) == pd._libs.tslibs.offsets.DateOffset:
@@ -120,73 +317,249 @@ def ro_framework(data, model,
         missing_feats = [k for k in feature_cols if k not in data.columns]
         if missing_feats:
             raise ValueError(f"{missing_feats} columns not present in the dataset")
-    if data.index.freq == None:
+    if id_col is not None and id_col not in data.columns:
+        raise ValueError(f"{id_col} not found in `data`")
+    if id_col is None and data.index.freq == None:
         raise ValueError(f"data.index.freq should not be `None`")
+    if not (executor is None or hasattr(executor, 'submit')):
+        raise ValueError("'executor' should be a `concurrent.futures.Executor`")
+    if not (n_jobs == -1 or (type(n_jobs) == int and n_jobs > 0)):
+        raise ValueError("'n_jobs' should be a positive `int` or -1 (all cores)")
+    if refit_mode not in _refit_modes:
+        raise ValueError(f"'refit_mode' should be one of {_refit_modes}")
+    if refit_mode == 'filter' and 'statsmodels' not in str(model):
+        # Prophet & scikit-learn fits have no fixed-params update, they would be silently refitted cold
+        raise ValueError("`refit_mode='filter'` is only supported by statsmodels models")
+    if refit_mode == 'warm' and _is_sklearn(model):
+        raise ValueError("scikit-learn models only support `refit_mode='cold'`")
+    if not (horizons is None or (type(horizons) == int and horizons > 0)):
+        raise ValueError("'horizons' should be a positive `int`")
+    if horizons and test_predict and not test_roll:
+        raise ValueError("'horizons' needs `test_roll=True` for the test predictions")
+    if feature_params is not None and not _is_sklearn(model):
+        raise ValueError("'feature_params' is only used by scikit-learn models")
+    if feature_params is not None and set(feature_params)-set(_default_feature_params):
+        raise ValueError(f"'feature_params' keys should be any of {list(_default_feature_params)}")
+    if _is_sklearn(model) and test_predict and not test_roll:
+        # The lag features of the test rows would need the (unknown) test actuals
+        raise ValueError("scikit-learn models need `test_roll=True` for the test predictions")
+    if not (train_window is None or (type(train_window) == int and train_window > 0)):
+        raise ValueError("'train_window' should be a positive `int`")
+    if train_window and refit_mode != 'cold':
+        # Warm/filter updates only ever extend the training window
+        raise ValueError("'train_window' is only supported with `refit_mode='cold'`")
+    if not (type(refit_every) == int and refit_every > 0):
+        raise ValueError("'refit_every' should be a positive `int`")
+    if refit_every > 1 and refit_mode == 'filter':
+        raise ValueError("'refit_every' is only supported with `refit_mode` 'cold' or 'warm'")
+    if refit_every > 1 and cache is not None:
+        # Reused forecasts depend on the window of the last refit, not on their own
+        raise ValueError("'cache' is only supported with `refit_every=1`")
+    if not (profile is None or isinstance(profile, OriginProfiler) or callable(profile)):
+        raise ValueError("'profile' should be an `OriginProfiler` or a callback")
+    metrics = get_metrics(metric)
+    if not (cache is None or type(cache) == str or isinstance(cache, ForecastCache)):
+        raise ValueError("'cache' should be a `ForecastCache` or a directory path `str`")
+    if cache is not None and refit_mode != 'cold':
+        # Warm/filter forecasts depend on the whole chain of previous origins, not just their own window
+        raise ValueError("'cache' is only supported with `refit_mode='cold'`")
+    if cache_key is not None and cache is None:
+        raise ValueError("'cache_key' is only used along with a `cache`")
+    if type(cache) == str:
+        cache = ForecastCache(cache)
+    # Resolved once, every origin's cache key reuses it
+    model_token = None if cache is None else _model_token(model, cache_key)
+    profiler = OriginProfiler(callback=profile) if callable(profile) else profile
+    if profiler is not None:
+        # A profiler passed to several backtests gathers all their records, keyed afresh by each
+        profiler.keys = {}
 
-    # Initialisations
-    cvDF = pd.DataFrame(columns = ['Actual', 'Forecast', metric])
-    testDF = pd.DataFrame(columns=['Actual', 'Forecast', metric])
+    # Origin schedule, shared by all the series in panel mode
+    schedule_index = data.index.unique().sort_values()
+    test_start = pd.to_datetime(test_start)
+    cv_indices = schedule_index[schedule_index<test_start][-cv_window:]
+    if cv_window > (schedule_index<test_start).sum()*0.5:
+        raise ValueError("`cv_window` should be less than {}".format(int((schedule_index<test_start).sum()*0.5)))
     
-    model = copy.deepcopy(model)
+    schedule = origin_schedule(schedule_index, cv_indices, ahead_offest, horizons=horizons,
+                               train_window=train_window)
+    # Fore debugging purpose - the CV schedule, without fitting anything
+    if debug:
+        return schedule
     
-    modelling_data = data.copy()
-    modelling_data.sort_index(inplace=True)
+    backtest_params = dict(model=copy.deepcopy(model), target_col=target_col, feature_cols=feature_cols,
+                           test_start=test_start, cv_window=cv_window, ahead_offest=ahead_offest,
+                           test_predict=test_predict, test_roll=test_roll, model_params=model_params,
+                           metrics=metrics, metric_params=metric_params, back_transform_func=back_transform_func,
+                           refit_mode=refit_mode, horizons=horizons, cache=cache, model_token=model_token,
+                           cv_indices=cv_indices, feature_params=feature_params, train_window=train_window,
+                           refit_every=refit_every)
+    if id_col is None:
+        # Positions in the schedule are positions in the (sorted) data, the CV roll reuses them
+        cv_schedule = schedule if data.index.is_unique else None
+        results = _ro_backtest(data, n_jobs=n_jobs, executor=executor, cv_schedule=cv_schedule,
+                               profiler=profiler, **backtest_params)
+    else:
+        results = _panel_backtest(data, id_col, schedule_index, n_jobs, executor, backtest_params, profiler)
+    return results
 
-    training_data = data[data.index<test_start].copy()
-    testing_data = data[data.index>=test_start].copy()
 
-    train_start = training_data.index[0]
+def _with_records(func, profiler, *args, **kwargs):
+    # Runs `func` in a worker with a detached profiler, its records travel back with the results
+    return func(*args, profiler=profiler, **kwargs), profiler.records
+
+
+def _panel_backtest(data, id_col, schedule_index, n_jobs, executor, backtest_params, profiler=None):
+    # Every series runs its own (sequential) backtest on the shared origin schedule, the series
+    # themselves are spread over the workers longest first so that no long series is left
+    # running alone at the end. A series that can not be backtested (e.g too short for `cv_window`)
+    # is skipped & reported in the 'Status' & 'Error' columns of the overall sheet.
+    panel_freq = schedule_index.freq or pd.infer_freq(schedule_index)
+    panel, errors = {}, {}
+    for series_id, series_data in data.groupby(id_col, sort=False, observed=True):
+        series_data = series_data.drop(columns=id_col).sort_index()
+        try:
+            series_data.index.freq = panel_freq
+        except ValueError:
+            errors[series_id] = ValueError(f"Series {series_id} does not follow the '{panel_freq}' frequency of the panel")
+        panel[series_id] = series_data
+    schedule = sorted([k for k in panel if k not in errors], key=lambda k: len(panel[k]), reverse=True)
     
-    test_start = pd.to_datetime(test_start)
+    results = {}
+    backtest_params = dict(backtest_params, progress=False)
+    if n_jobs == 1 and executor is None:
+        for series_id in tqdm(schedule, desc='Running Panel Backtests', leave=True):
+            if profiler is not None:
+                profiler.keys = {'Series': series_id}
+            try:
+                results[series_id] = _ro_backtest(panel[series_id], profiler=profiler, **backtest_params)
+            except ValueError as e:
+                errors[series_id] = e
+    else:
+        _own_executor = executor is None
+        if _own_executor:
+            executor = ProcessPoolExecutor(max_workers=os.cpu_count() if n_jobs == -1 else n_jobs)
+        try:
+            if profiler is None:
+                _futures = {executor.submit(_ro_backtest, panel[k], **backtest_params): k for k in schedule}
+            else:
+                _futures = {}
+                for k in schedule:
+                    profiler.keys = {'Series': k}
+                    _futures[executor.submit(_with_records, _ro_backtest, profiler.detached(), panel[k],
+                                             **backtest_params)] = k
+            for _future in tqdm(as_completed(_futures), total=len(_futures), desc='Running Panel Backtests', leave=True):
+                try:
+                    results[_futures[_future]] = _future.result()
+                except ValueError as e:
+                    errors[_futures[_future]] = e
+                    continue
+                if profiler is not None:
+                    results[_futures[_future]], _records = results[_futures[_future]]
+                    profiler.extend(_records)
+        finally:
+            if _own_executor:
+                executor.shutdown(wait=True)
+    
+    _done = [k for k in panel if k in results]
+    if not _done:
+        _first = next(iter(panel))
+        raise ValueError(f"No series of the panel could be backtested, series {_first}: {errors[_first]}")
+    
+    # Stacked sheets keyed by series id, in the order of appearance in `data`
+    cvDF, testDF = [pd.concat({k: results[k][i] for k in _done}, names=[id_col]) for i in range(2)]
+    _template = results[_done[0]][2]
+    overall = {}
+    for k in panel:
+        if k in results:
+            overall[k] = results[k][2].assign(Status='Backtested', Error='')
+        else:
+            overall[k] = pd.DataFrame(np.nan, index=_template.index, columns=_template.columns)
+            overall[k] = overall[k].assign(Status='Skipped', Error=repr(errors[k]))
+    overallDF = pd.concat(overall, names=[id_col])
+    fitted_models = {k: results[k][3] for k in _done}
+    return cvDF, testDF, overallDF, fitted_models
+
+
+def _ro_backtest(data, model,
+                 target_col, feature_cols,
+                 test_start, cv_window, ahead_offest,
+                 test_predict, test_roll,
+                 model_params, metrics, metric_params, back_transform_func,
+                 refit_mode='cold', horizons=None, cache=None, model_token=None, cv_indices=None,
+                 n_jobs=1, executor=None, progress=True, feature_params=None,
+                 train_window=None, refit_every=1, cv_schedule=None, profiler=None):
+
+    # Initialisations
+    testDF = pd.DataFrame(columns=['Actual', 'Forecast']+metrics, dtype=np.float64)
+    
+    # Positional views of a single sorted frame, the rolls never modify them
+    modelling_data = data if data.index.is_monotonic_increasing else data.sort_index()
+    _test_pos = modelling_data.index.searchsorted(test_start)
+    training_data = modelling_data.iloc[:_test_pos]
+    testing_data = modelling_data.iloc[_test_pos:]
+
+    train_start = training_data.index[0]
     test_end = modelling_data.index[-1]
     
     if cv_window > training_data.shape[0]*0.5:
         raise ValueError("`cv_window` should be less than {}".format(int(training_data.shape[0]*0.5)))
-    
-    # Fore debugging purpose
-    if debug:
-        debugDF = pd.DataFrame(columns=['Train Start', 'Train End', 'CV Point', 'Diff'])
-        for cv_date in training_data.index[-cv_window:]:
-            train_end = cv_date-ahead_offest
-            _packet = {'Train Start': train_start, 'Train End': train_end,
-                       'CV Point': cv_date, 'Diff': str(getattr(ahead_offest, ahead_offest_freq))+' '+ahead_offest_freq}
-            debugDF = debugDF.append(_packet, ignore_index=True)
-        display(debugDF)
-        return None
-    
+    cv_indices = training_data.index[-cv_window:] if cv_indices is None else cv_indices.intersection(training_data.index)
     
     # Picking the Metrics
-    if metric == 'MAPE':
-        metric_func = lambda y,yhat: np.round(abs((np.array(y)-np.array(yhat))/np.array(y))*100,2)
-    elif metric == 'MSE':
-        metric_func = lambda y,yhat: np.round((np.array(y)-np.array(yhat))**2,2)
+    _metric_ctx = dict(metric_params or {})
+    # Forecast intervals are only produced when a metric needs them
+    _alpha = _metric_ctx.pop('alpha', 0.05) if metrics_need(metrics, 'interval') else None
+    if metrics_need(metrics, 'scale') and 'scale' not in _metric_ctx:
+        # MASE - scaled by the in-sample seasonal naive errors on the training target
+        _scale_target = training_data[target_col].values
+        if back_transform_func:
+            _scale_target = back_transform_func(_scale_target)
+        _metric_ctx['scale'] = seasonal_naive_scale(_scale_target, m=_metric_ctx.get('m', 1))
     
     
     # Cross Validation Loop
-    cvDF, fitted_model = _roll_loop_modelling(pred_indices = training_data.index[-cv_window:], data = training_data.copy(),
+    cvDF, fitted_model = _roll_loop_modelling(pred_indices = cv_indices, data = training_data,
                                              train_start = train_start, feature_cols = feature_cols,
                                              target_col = target_col, ahead_offest = ahead_offest,
-                                             metric_func = metric_func, modedf = cvDF, metric = metric,
-                                             model = model, model_params = model_params, back_transform_func = back_transform_func)
+                                             metrics = metrics, metric_ctx = _metric_ctx,
+                                             model = model, model_params = model_params, back_transform_func = back_transform_func,
+                                             n_jobs = n_jobs, executor = executor, refit_mode = refit_mode,
+                                             horizons = horizons, alpha = _alpha, cache = cache, model_token = model_token, progress = progress,
+                                             feature_params = feature_params, train_window = train_window, refit_every = refit_every,
+                                             schedule = cv_schedule, profiler = profiler)
     
     # Testing - Using the last fitted_model
     if test_predict:
         if test_roll:
-            testDF, _ = _roll_loop_modelling(pred_indices = testing_data.index, data = modelling_data.copy(),
+            testDF, _ = _roll_loop_modelling(pred_indices = testing_data.index, data = modelling_data,
                                                         train_start = train_start, feature_cols = feature_cols,
                                                         target_col = target_col, ahead_offest = ahead_offest,
-                                                        metric_func = metric_func, modedf = testDF, metric = metric,
-                                                        model = model, model_params = model_params, _desc = 'Running Test Roll', back_transform_func = back_transform_func)
+                                                        metrics = metrics, metric_ctx = _metric_ctx,
+                                                        model = model, model_params = model_params, _desc = 'Running Test Roll', back_transform_func = back_transform_func,
+                                                        n_jobs = n_jobs, executor = executor, refit_mode = refit_mode,
+                                                        horizons = horizons, alpha = _alpha, cache = cache, model_token = model_token, progress = progress,
+                                                        feature_params = feature_params, train_window = train_window, refit_every = refit_every,
+                                                        profiler = profiler, _roll = 'Test')
         else:
             testDF = _simple_modelling(data = testing_data, fitted_model=fitted_model,
                                       feature_cols=feature_cols, target_col=target_col,
-                                      metric_func=metric_func, modedf=testDF, metric=metric,
-                                      back_transform_func=back_transform_func, test_start=test_start, test_end=test_end)
+                                      metrics=metrics, metric_ctx=_metric_ctx, alpha=_alpha,
+                                      back_transform_func=back_transform_func, test_start=test_start, test_end=test_end,
+                                      profiler=profiler)
     
     # Prepare Overall Metric
-    overallDF = pd.DataFrame([cvDF[metric].mean(), testDF[metric].mean()],
-                             columns=['Overall '+metric],
-                             index=['CV', 'Test'])
+    if horizons:
+        # One column per horizon
+        if not test_predict:
+            testDF = cvDF.iloc[:0].copy()
+        overallDF = pd.concat({'Overall '+k: pd.DataFrame([aggregate_metric(k, cvDF[k]), aggregate_metric(k, testDF[k])],
+                                                          index=['CV', 'Test'], columns=cvDF[k].columns)
+                               for k in metrics}, axis=1)
+    else:
+        overallDF = pd.DataFrame({'Overall '+k: [aggregate_metric(k, cvDF[k]), aggregate_metric(k, testDF[k])]
+                                  for k in metrics},
+                                 index=['CV', 'Test'])
     
     cvDF = cvDF.replace({np.inf:np.nan})
     testDF = testDF.replace({np.inf:np.nan})
@@ -197,111 +570,550 @@ def ro_framework(data, model,
 def _roll_loop_modelling(pred_indices, data,
                         train_start, feature_cols,
                         target_col, ahead_offest,
-                        metric_func, modedf, metric,
-                        model, model_params, _desc = 'Running CV Roll', back_transform_func=None):
-    
-    for pred_date in tqdm(pred_indices, desc=_desc, leave=True):
-        train_end = pred_date-ahead_offest
-        # Filter the data
-        _train_data = data.truncate(before=train_start, after=train_end)
-        _pred_data = data.loc[pred_date].to_frame().T
-        
-        if feature_cols:
-            # Multivariate
-            if 'Prophet' in str(model):
-                _prophet_model = model.get_pmodelinstance()
-                _traindf =  _train_data.copy()
-                _traindf = _traindf[[target_col]+feature_cols]
-                _traindf.index.name = 'ds'
-                _traindf.reset_index(inplace=True)
-                _traindf.rename(columns={target_col:'y'}, inplace=True)
-
-                # Make the forecasting dataframe
-                _forecastdf =  _pred_data.copy()
-                _forecastdf = _forecastdf[feature_cols]
-                _forecastdf.index.name = 'ds'
-                _forecastdf.reset_index(inplace=True)
-                _forecastdf.rename(columns={target_col:'y'}, inplace=True)
-                
-                with suppress_stdout_stderr():
-                    _fitted_model = _prophet_model.fit(_traindf)
-                    _forecast = _prophet_model.predict(_forecastdf).yhat.values[0]
-                _actual = _pred_data[target_col].values[0]
+                        metrics, metric_ctx,
+                        model, model_params, _desc = 'Running CV Roll', back_transform_func=None,
+                        n_jobs=1, executor=None, refit_mode='cold', horizons=None, alpha=None,
+                        cache=None, model_token=None, progress=True, feature_params=None, train_window=None,
+                        refit_every=1, schedule=None, profiler=None, _roll='CV'):
+    
+    if schedule is None:
+        _windows = _origin_windows(pred_indices, data.index, train_start, ahead_offest, horizons, train_window)
+        if horizons:
+            # One path per training cutoff, as in `origin_schedule`
+            _keep = _first_per_cutoff(_windows)
+            pred_indices, _windows = pred_indices[_keep], tuple(w[_keep] for w in _windows)
+    else:
+        # Positions of a precomputed `origin_schedule`, the horizon paths stop at the end of `data`
+        pred_indices = pd.DatetimeIndex(schedule['CV Point'])
+        _windows = tuple(schedule[k].to_numpy() for k in _window_cols)
+        _windows = _windows[:3]+(np.minimum(_windows[3], len(data)),)
+    
+    _loop_params = dict(data=data, feature_cols=feature_cols, target_col=target_col,
+                        model=model, model_params=model_params, refit_mode=refit_mode,
+                        horizons=horizons, alpha=alpha, cache=cache, model_token=model_token,
+                        refit_every=refit_every)
+    if _is_sklearn(model):
+        _loop_params['design'] = _sklearn_design(_windows, data, feature_cols, target_col, feature_params,
+                                                 parallel=not (n_jobs == 1 and executor is None))
+    
+    if profiler is not None:
+        profiler.keys['Roll'] = _roll
+    if n_jobs == 1 and executor is None:
+        with tqdm(total=len(pred_indices), desc=_desc, leave=True, disable=not progress) as pbar:
+            _sheets, _fitted_model = _fit_predict_chunk(_windows, progress=pbar, profiler=profiler, **_loop_params)
+    else:
+        _sheets, _fitted_model = _parallel_fit_predict(_windows, _desc, n_jobs, executor, _loop_params, profiler)
+
+    _timer = _null_timer if profiler is None else profiler.timer()
+    modedf = _metric_sheets(_sheets, pred_indices, metrics, metric_ctx,
+                            back_transform_func=back_transform_func, horizons=horizons)
+    _timer.mark('Metric')
+    if profiler is not None:
+        # Metrics are computed once for the whole roll
+        profiler.add(dict(_timer.finish(), Origin=pd.NaT))
+    return modedf, _fitted_model
+
+
+def _metric_sheets(sheets, index, metrics, metric_ctx, back_transform_func=None, horizons=None):
+    # Update Metric Sheets - once, over the whole set of forecasts
+    if back_transform_func:
+        sheets = {k: back_transform_func(v) for k, v in sheets.items()}
+    else:
+        sheets = dict(sheets)
+    _ctx = dict(metric_ctx, lower=sheets.get('Lower'), upper=sheets.get('Upper'))
+    sheets.update(compute_metrics(metrics, sheets['Actual'], sheets['Forecast'], _ctx))
+    
+    if horizons:
+        # (origin x horizon) sheets, horizon 1 being the origin itself, `ahead_offest` after the training cutoff
+        _horizons = pd.RangeIndex(1, horizons+1, name='Horizon')
+        return pd.concat({k: pd.DataFrame(v, index=index, columns=_horizons) for k, v in sheets.items()}, axis=1)
+    return pd.DataFrame({k: np.ravel(v) for k, v in sheets.items()}, index=index, dtype=np.float64)
+
+
+def _parallel_fit_predict(windows, _desc, n_jobs, executor, loop_params, profiler=None):
+    # Origins are split into contiguous chunks and each chunk is fitted sequentially inside
+    # a worker. Chunks (rather than single origins) keep the pickling of `data` down to once
+    # per chunk. Warm/filter chains start cold at every chunk, see `ro_framework`.
+    _own_executor = executor is None
+    if _own_executor:
+        n_jobs = os.cpu_count() if n_jobs == -1 else n_jobs
+        executor = ProcessPoolExecutor(max_workers=n_jobs)
+    _n_workers = getattr(executor, '_max_workers', None) or os.cpu_count()
+    
+    # Chunks hold whole blocks of `refit_every` origins, so that the refits happen at the same
+    # origins as in a sequential roll
+    _n_origins = len(windows[0])
+    _refit_every = loop_params.get('refit_every', 1)
+    _blocks = np.arange(-(-_n_origins//_refit_every))
+    _chunks = [np.arange(k[0]*_refit_every, min((k[-1]+1)*_refit_every, _n_origins))
+               for k in np.array_split(_blocks, min(len(_blocks), _n_workers*4)) if len(k)]
+    
+    _results = [None]*len(_chunks)
+    try:
+        if profiler is None:
+            _futures = {executor.submit(_fit_predict_chunk, tuple(w[k] for w in windows),
+                                        return_model=(i == len(_chunks)-1), **loop_params): i
+                        for i, k in enumerate(_chunks)}
         else:
-            # Univariate
-            if 'statsmodels' in str(model):
+            _futures = {executor.submit(_with_records, _fit_predict_chunk, profiler.detached(), tuple(w[k] for w in windows),
+                                        return_model=(i == len(_chunks)-1), **loop_params): i
+                        for i, k in enumerate(_chunks)}
+        with tqdm(total=_n_origins, desc=_desc, leave=True) as pbar:
+            for _future in as_completed(_futures):
+                i = _futures[_future]
+                _results[i] = _future.result()
+                if profiler is not None:
+                    _results[i], _records = _results[i]
+                    profiler.extend(_records)
+                pbar.update(len(_chunks[i]))
+    finally:
+        if _own_executor:
+            executor.shutdown(wait=True)
+    
+    # Results are re-assembled in chunk order, independent of completion order
+    _sheets = {k: np.concatenate([_res[0][k] for _res in _results]) for k in _results[0][0]}
+    _fitted_model = _results[-1][1]
+    return _sheets, _fitted_model
+
+
+def _fit_predict_chunk(windows, data,
+                       feature_cols, target_col,
+                       model, model_params, refit_mode='cold', horizons=None, alpha=None,
+                       cache=None, model_token=None, return_model=True, progress=None, design=None, refit_every=1,
+                       prev_fit=None, prev_train_stop=None, profiler=None):
+    _n_origins = len(windows[0])
+    _cols = ['Actual', 'Forecast'] + (['Lower', 'Upper'] if alpha else [])
+    _sheets = {k: np.full((_n_origins, horizons or 1), np.nan, dtype=np.float64) for k in _cols}
+    _prophet_df, _quiet = None, None
+    if 'Prophet' in str(model):
+        _prophet_df = _prophet_frame(data, target_col, feature_cols)
+        # A single quiet context, opened once, for all the fits of the chunk
+        _quiet = suppress_stdout_stderr().open()
+    # A previous fit (streaming updates) is continued by the warm/filter refits
+    _fitted_model, _train_stop = prev_fit, prev_train_stop
+    # statsmodels models are imported by the caller, possibly after this package (see `_ignore_warnings`)
+    _ignore_warnings()
+    _traced = profiler is not None and profiler.start_tracing()
+    try:
+        for i, _window in enumerate(zip(*windows)):
+            # Warm refits continue from the previous fit of the same chunk, each chunk starts cold
+            _reuse = _fitted_model is not None and i % refit_every != 0
+            _timer = _null_timer if profiler is None else profiler.timer()
+            _sheet, _fitted_model = _fit_predict_origin(_window, data, feature_cols,
+                                                        target_col, model, model_params,
+                                                        refit_mode=refit_mode, prev_fit=_fitted_model,
+                                                        prev_train_stop=_train_stop, horizons=horizons, alpha=alpha,
+                                                        cache=cache, model_token=model_token,
+                                                        need_model=(return_model and i == _n_origins-1),
+                                                        prophet_df=_prophet_df, design=design, reuse=_reuse,
+                                                        quiet=_quiet, timer=_timer)
+            if not _reuse:
+                _train_stop = _window[1]
+            for k, v in _sheet.items():
+                # Paths running past the end of `data` are shorter than `horizons`
+                _sheets[k][i, :len(v)] = v
+            if profiler is not None:
+                profiler.add(dict(_timer.finish(None if _reuse else _fitted_model), Origin=data.index[_window[2]]))
+            if progress is not None:
+                progress.update(1)
+    finally:
+        if _quiet is not None:
+            _quiet.close()
+        if _traced:
+            profiler.stop_tracing()
+    
+    if not return_model:
+        _fitted_model = None
+    return _sheets, _fitted_model
+
+
+def origin_schedule(index, origins, ahead_offest, train_start=None, horizons=None, train_window=None):
+    # One row per forecasting origin - its training window & forecasted span, as dates and as
+    # integer positions into `index`, computed vectorized. `ro_framework` rolls over these positions.
+    index, origins = pd.DatetimeIndex(index), pd.DatetimeIndex(origins)
+    train_start = index[0] if train_start is None else pd.to_datetime(train_start)
+    _windows = _origin_windows(origins, index, train_start, ahead_offest, horizons, train_window)
+    if horizons:
+        _keep = _first_per_cutoff(_windows)
+        origins, _windows = origins[_keep], tuple(w[_keep] for w in _windows)
+    _train_begin, _train_stop, _pred_begin, _pred_stop = _windows
+    
+    _last = len(index)-1
+    schedule = pd.DataFrame({'Train Start': index[np.minimum(_train_begin, _last)],
+                             'Train End': index[np.maximum(_train_stop-1, 0)],
+                             'CV Point': origins,
+                             'Forecast End': index[np.maximum(_pred_stop-1, 0)],
+                             'Horizon': _pred_stop-_train_stop,
+                             'Diff': ' '.join(f'{v} {k}' for k, v in ahead_offest.kwds.items())})
+    for k, v in zip(_window_cols, _windows):
+        schedule[k] = v
+    return schedule
+
+
+def _origin_windows(pred_indices, index, train_start, ahead_offest, horizons=None, train_window=None):
+    # Integer positions (begin, stop) of every origin's training window & forecasting rows in
+    # `index`, computed once so that each origin only takes positional slices (views, no copies)
+    _train_stop = index.searchsorted(_cutoff_dates(pred_indices, ahead_offest), side='right')
+    _train_begin = np.full(len(pred_indices), index.searchsorted(train_start))
+    if train_window:
+        # Sliding window - the last `train_window` rows before the cutoff
+        _train_begin = np.maximum(_train_begin, _train_stop-train_window)
+    _pred_begin = index.get_indexer(pred_indices)
+    if horizons:
+        # The path of `horizons` observations starting at the origin, i.e horizon 1 is `ahead_offest`
+        # after the training cutoff
+        _pred_stop = np.minimum(_pred_begin+horizons, len(index))
+    else:
+        _pred_stop = _pred_begin+1
+    return _train_begin, _train_stop, _pred_begin, _pred_stop
+
+
+def _cutoff_dates(pred_indices, ahead_offest):
+    # `pred_date - ahead_offest`, except that month-ends stay month-ends under whole month/year
+    # offsets: 06-30 minus a month is cut at 05-31, not at 05-30 - which a month-end index would
+    # round down to 04-30, the cutoff of 05-31 too, making 06-30 silently a 2-step forecast
+    _cutoffs = pd.DatetimeIndex(pred_indices)-ahead_offest
+    if ahead_offest.kwds and set(ahead_offest.kwds) <= {'months', 'years'}:
+        _month_end = pd.DatetimeIndex(pred_indices).is_month_end
+        _cutoffs = _cutoffs.where(~_month_end, _cutoffs+pd.offsets.MonthEnd(0))
+    return _cutoffs
+
+
+def _first_per_cutoff(windows):
+    # Mask of the first origin of every training cutoff - calendar offsets can map neighbouring
+    # origins onto the same cutoff (e.g 05-31 & 06-30 minus a month, both cut at 04-30), their
+    # horizon paths would be the same forecasts counted twice
+    _train_stop = windows[1]
+    return np.r_[True, _train_stop[1:] != _train_stop[:-1]] if len(_train_stop) else np.ones(0, dtype=bool)
+
+
+def _prophet_frame(data, target_col, feature_cols):
+    # `data` in Prophet's layout (ds, y, regressors), built once per roll & sliced per origin
+    _frame = data[[target_col]+list(feature_cols or [])].rename(columns={target_col:'y'})
+    _frame.index.name = 'ds'
+    return _frame.reset_index()
+
+
+def _fit_predict_origin(window, data, feature_cols,
+                        target_col, model, model_params,
+                        refit_mode='cold', prev_fit=None, prev_train_stop=None, horizons=None, alpha=None,
+                        cache=None, model_token=None, need_model=False, prophet_df=None, design=None, reuse=False,
+                        quiet=None, timer=_null_timer):
+    
+    _train_begin, _train_stop, _pred_begin, _pred_stop = window
+    # Filter the data - views into `data`, models do not modify their inputs
+    _train_data = data.iloc[_train_begin:_train_stop]
+    _pred_data = data.iloc[_pred_begin:_pred_stop]
+    _pred_start, _pred_end = _pred_data.index[0], _pred_data.index[-1]
+    timer.note(Refit=not reuse, Cached=False)
+    
+    if reuse:
+        # No refit at this origin, the previous fit forecasts further ahead of its own cutoff
+        _sheet = {'Actual': _pred_data[target_col].values}
+        timer.mark('Prep')
+        if design is not None:
+            _sheet['Forecast'] = np.asarray(prev_fit.predict(design['X'][_pred_begin:_pred_stop]), dtype=np.float64)
+        elif 'Prophet' in str(model):
+            _forecastdf = prophet_df.iloc[_pred_begin:_pred_stop][['ds']+list(feature_cols or [])]
+            with quiet or suppress_stdout_stderr():
+                _sheet.update(_prophet_sheet(prev_fit.predict(_forecastdf), alpha))
+        elif 'statsmodels' in str(model):
+            _sheet.update(_statsmodels_sheet(prev_fit, _pred_start, _pred_end, alpha))
+        timer.mark('Predict')
+        return _sheet, prev_fit
+    
+    if cache is not None:
+        _used_cols = [target_col]+list(feature_cols or [])
+        _options = {} if design is None else {'features': design['columns']}
+        _cache_key = cache.key(_train_data[_used_cols], _pred_data[_used_cols], model_token, model_params,
+                               horizons=horizons, alpha=alpha, **_options)
+        _cached = cache.get(_cache_key, need_model=need_model)
+        if _cached is not None:
+            timer.mark('Prep')
+            timer.note(Cached=True)
+            return _cached
+    
+    _sheet = {'Actual': _pred_data[target_col].values}
+    _fitted_model = None
+    timer.mark('Prep')
+    if design is not None:
+        # scikit-learn - uni & multivariate alike, `feature_cols` are columns of the design matrix
+        _X, _y = design['X'], design['y']
+        _rows = np.arange(max(_train_begin, design['first_row']), _train_stop)
+        _rows = _rows[~np.isnan(_y[_rows])]
+        _fitted_model = _sklearn_estimator(model, model_params, design['n_jobs'])
+        _fitted_model.fit(_X[_rows], _y[_rows])
+        timer.mark('Fit')
+        _sheet['Forecast'] = np.asarray(_fitted_model.predict(_X[_pred_begin:_pred_stop]), dtype=np.float64)
+        timer.mark('Predict')
+    elif feature_cols:
+        # Multivariate
+        if 'Prophet' in str(model):
+            _traindf = prophet_df.iloc[_train_begin:_train_stop]
+            # Make the forecasting dataframe
+            _forecastdf = prophet_df.iloc[_pred_begin:_pred_stop][['ds']+feature_cols]
+            
+            with quiet or suppress_stdout_stderr():
+                _fitted_model = _fit_prophet(model, _traindf, prev_fit if refit_mode == 'warm' else None)
+                timer.mark('Fit')
+                _sheet.update(_prophet_sheet(_fitted_model.predict(_forecastdf), alpha))
+                timer.mark('Predict')
+    else:
+        # Univariate
+        if 'statsmodels' in str(model):
+            if refit_mode != 'cold' and hasattr(prev_fit, 'append'):
+                # Extend the previous results with the new observations only
+                _new_endog = data[target_col].iloc[prev_train_stop:_train_stop]
+                if _new_endog.empty:
+                    # Training window did not grow (e.g month-end offsets), nothing to update
+                    _fitted_model = prev_fit
+                elif refit_mode == 'warm':
+                    # Closed form estimators (e.g AutoReg) have no optimizer to warm-start
+                    _fit_kwargs = {}
+                    if 'start_params' in signature(prev_fit.model.fit).parameters:
+                        _fit_kwargs['start_params'] = prev_fit.params
+                    _fitted_model = prev_fit.append(_new_endog, refit=True, fit_kwargs=_fit_kwargs)
+                else:
+                    _fitted_model = prev_fit.append(_new_endog, refit=False)
+            else:
                 # Update Model Params Based on library
-                model_params['endog'] = _train_data[target_col]
-                modeldef = model(**model_params)
+                _model_params = dict(model_params or {})
+                _model_params['endog'] = _train_data[target_col]
+                modeldef = model(**_model_params)
                 
                 _fitted_model = modeldef.fit()
-                _forecast = _fitted_model.predict(start=pred_date, end=pred_date).values[0]
-                _actual = _pred_data[target_col].values[0]
-            elif 'Prophet' in str(model):
-                # Make the training dataframe
-                _prophet_model = model.get_pmodelinstance()
-                _traindf =  _train_data.copy()
-                _traindf.index.name = 'ds'
-                _traindf.reset_index(inplace=True)
-                _traindf.rename(columns={target_col:'y'}, inplace=True)
-                
-                # Make the forecasting dataframe
-                _forecastdf = pd.DataFrame(columns=['ds'])
-                _forecastdf['ds'] = [pred_date]
-                with suppress_stdout_stderr():
-                    _fitted_model = _prophet_model.fit(_traindf)
-                    _forecast = _prophet_model.predict(_forecastdf).yhat.values[0]
-                _actual = _pred_data[target_col].values[0]
-
-        # Update Metric Sheets
-        if back_transform_func:
-            _actual = back_transform_func(_actual)
-            _forecast = back_transform_func(_forecast)
-            
-        modedf.loc[pred_date, 'Actual'] = _actual
-        modedf.loc[pred_date, 'Forecast'] = _forecast
-        modedf.loc[pred_date,  metric] = metric_func(_actual, _forecast)
+            timer.mark('Fit')
+            _sheet.update(_statsmodels_sheet(_fitted_model, _pred_start, _pred_end, alpha))
+            timer.mark('Predict')
+        elif 'Prophet' in str(model):
+            _traindf = prophet_df.iloc[_train_begin:_train_stop]
+            # Make the forecasting dataframe
+            _forecastdf = prophet_df.iloc[_pred_begin:_pred_stop][['ds']]
+            with quiet or suppress_stdout_stderr():
+                _fitted_model = _fit_prophet(model, _traindf, prev_fit if refit_mode == 'warm' else None)
+                timer.mark('Fit')
+                _sheet.update(_prophet_sheet(_fitted_model.predict(_forecastdf), alpha))
+                timer.mark('Predict')
 
-    return modedf, _fitted_model
+    if cache is not None:
+        cache.put(_cache_key, _sheet, _fitted_model)
+        timer.mark('Prep')
+    return _sheet, _fitted_model
+
+
+def _is_sklearn(model):
+    # scikit-learn estimators & pipelines, or anything following their API (e.g xgboost, lightgbm)
+    return hasattr(model, 'get_params') and hasattr(model, 'set_params') and 'statsmodels' not in str(model)
+
+
+def _sklearn_design(windows, data, feature_cols, target_col, feature_params=None, parallel=False):
+    # Lags start at the furthest step any origin of the roll forecasts ahead of its cutoff
+    _offset = max(int(np.max(windows[3]-windows[1], initial=1))-1, 0)
+    _X, _columns, _first_row = lag_feature_matrix(data, target_col, feature_cols, offset=_offset,
+                                                  **dict(_default_feature_params, **(feature_params or {})))
+    # Estimators fitted inside the workers of a parallel roll are kept single threaded
+    return {'X': _X, 'y': data[target_col].to_numpy(dtype=np.float64), 'columns': _columns,
+            'first_row': _first_row, 'n_jobs': 1 if parallel else None}
+
+
+def _sklearn_estimator(model, model_params, n_jobs=None):
+    from sklearn.base import clone
+    _estimator = model() if isclass(model) else clone(model)
+    _params = dict(model_params or {})
+    if n_jobs is not None:
+        _params.update({k: n_jobs for k in _estimator.get_params() if k == 'n_jobs' or k.endswith('__n_jobs')})
+    return _estimator.set_params(**_params)
+
+
+def _fit_prophet(model, traindf, prev_fit=None):
+    # A Prophet model can only be fitted once, so every origin gets a new instance
+    _prophet_model = model.get_pmodelinstance()
+    _params = getattr(prev_fit, 'params', None)
+    if _params:
+        # Warm start - the optimizer starts from the previous fit's params
+        _init = {'k': _params['k'][0][0], 'm': _params['m'][0][0], 'sigma_obs': _params['sigma_obs'][0][0],
+                 'delta': _params['delta'][0], 'beta': _params['beta'][0]}
+        try:
+            return _prophet_model.fit(traindf, init=_init)
+        except (RuntimeError, ValueError):
+            # Params of another shape (e.g a seasonality switched on with the longer history), fit cold
+            _prophet_model = model.get_pmodelinstance()
+    return _prophet_model.fit(traindf)
+
+
+def _statsmodels_sheet(fitted_model, start, end, alpha=None):
+    if not alpha:
+        return {'Forecast': np.asarray(fitted_model.predict(start=start, end=end))}
+    try:
+        _prediction = fitted_model.get_prediction(start=start, end=end)
+        _interval = np.asarray(_prediction.conf_int(alpha=alpha))
+    except (ValueError, IndexError, AttributeError, NotImplementedError):
+        # No intervals for this span (e.g AutoReg forecasting past a gap after its sample), the
+        # interval metrics come out NaN
+        _forecast = np.asarray(fitted_model.predict(start=start, end=end))
+        return {'Forecast': _forecast, 'Lower': np.full(len(_forecast), np.nan),
+                'Upper': np.full(len(_forecast), np.nan)}
+    return {'Forecast': np.asarray(_prediction.predicted_mean),
+            'Lower': _interval[:, 0], 'Upper': _interval[:, 1]}
+
+
+def _prophet_sheet(forecastdf, alpha=None):
+    # Prophet's interval width is fixed when the model is built, `alpha` only switches it on
+    _sheet = {'Forecast': forecastdf.yhat.values}
+    if alpha:
+        _sheet['Lower'] = forecastdf.yhat_lower.values
+        _sheet['Upper'] = forecastdf.yhat_upper.values
+    return _sheet
 
 
 def _simple_modelling(data, fitted_model, feature_cols,
-                     target_col, metric_func, modedf, metric,
-                     back_transform_func, test_start=None, test_end=None):
+                     target_col, metrics, metric_ctx,
+                     back_transform_func, test_start=None, test_end=None, alpha=None, profiler=None):
     
+    _timer = _null_timer if profiler is None else profiler.timer()
+    _sheets = {'Actual': data[target_col].values}
     if feature_cols:
         # Multivariate
         if 'Prophet' in str(fitted_model):
             # Make the forecasting dataframe
             _forecastdf =  data.copy()
-            modedf['Actual'] = _forecastdf[target_col]
             _forecastdf = _forecastdf[feature_cols]
             _forecastdf.index.name = 'ds'
             _forecastdf.reset_index(inplace=True)
             with suppress_stdout_stderr():
-                modedf['Forecast'] = fitted_model.predict(_forecastdf).yhat.values
+                _sheets.update(_prophet_sheet(fitted_model.predict(_forecastdf), alpha))
     else:
         # Univariate
         if 'statsmodels' in str(fitted_model):
-            modedf['Actual'] = data[target_col]
-            modedf['Forecast'] = fitted_model.predict(start=test_start, end=test_end)
-            modedf[metric] = modedf.apply(lambda x : metric_func(x.Actual, x.Forecast), axis=1)
+            _sheet = _statsmodels_sheet(fitted_model, test_start, test_end, alpha)
+            # Align the predicted span onto the testing index
+            _span = pd.date_range(test_start, periods=len(_sheet['Forecast']), freq=data.index.freq)
+            _sheets.update({k: pd.Series(v, index=_span).reindex(data.index).values for k, v in _sheet.items()})
         elif 'Prophet' in str(fitted_model):
             # Make the training dataframe
             _forecastdf =  data.copy()
-            modedf['Actual'] = _forecastdf[target_col]
             _forecastdf.index.name = 'ds'
             _forecastdf.reset_index(inplace=True)
             _forecastdf = _forecastdf[['ds']].copy()
-            modedf['Forecast'] = fitted_model.predict(_forecastdf).yhat.values
+            _sheets.update(_prophet_sheet(fitted_model.predict(_forecastdf), alpha))
+    
+    if 'Forecast' not in _sheets:
+        _sheets['Forecast'] = np.full(len(data), np.nan)
+    _timer.mark('Predict')
+    testDF = _metric_sheets(_sheets, data.index, metrics, metric_ctx, back_transform_func=back_transform_func)
+    _timer.mark('Metric')
+    if profiler is not None:
+        # The whole test span is forecasted once, by the last CV model
+        profiler.keys['Roll'] = 'Test'
+        _timer.note(Refit=False, Cached=False)
+        profiler.add(dict(_timer.finish(), Origin=data.index[0]))
+    return testDF
 
-    # Update Metric Sheets
-    if back_transform_func:
-        modedf['Actual'] = back_transform_func(modedf['Actual'])
-        modedf['Forecast'] = back_transform_func(modedf['Forecast'])
-    modedf[metric] = modedf.apply(lambda x : metric_func(x.Actual, x.Forecast), axis=1)
 
-    return modedf
+class StreamingBacktest:
+    '''
+    Online version of the `ro_framework` CV roll, for a series growing by a few rows every period.
+       `update(new_rows)` appends the rows to the data & forecasts only the origins they add (every
+    new row is an origin, forecasted from its `ahead_offest` cutoff), then folds their metrics into
+    running aggregates, so `overall` costs O(1) per new point. With `refit_mode` 'warm'/'filter'
+    the fitted model carries over from one update to the next.
+       `cv_window` - backtest the last `cv_window` rows of `data` right away, as the CV roll would.
+    '''
+    def __init__(self, data, model, target_col, ahead_offest, feature_cols=None, model_params=None,
+                 metric='MAPE', metric_params=None, back_transform_func=None, refit_mode='cold',
+                 train_window=None, feature_params=None, cv_window=0):
+        # Checks
+        if not (hasattr(model, 'fit') & hasattr(model, 'predict')):
+            raise ValueError("Model Passed should be having '.fit' & '.predict' methods, i.e foloowing the sklearn API")
+        if type(data) != pd.core.frame.DataFrame:
+            raise ValueError("Data should be a pandas dataframe of type 'pd.DataFrame'")
+        if type(data.index) != pd.core.indexes.datetimes.DatetimeIndex:
+            raise ValueError("Data should be having index of type 'pd.DatetimeIndex'")
+        if data.index.freq == None:
+            raise ValueError(f"data.index.freq should not be `None`")
+        if not type(ahead_offest) == pd._libs.tslibs.offsets.DateOffset:
+            raise ValueError("'ahead_offest' should be a 'pd.DateOffset'")
+        if target_col not in data.columns:
+            raise ValueError(f"{target_col} not found in `data`")
+        if refit_mode not in _refit_modes:
+            raise ValueError(f"'refit_mode' should be one of {_refit_modes}")
+        if refit_mode == 'filter' and 'statsmodels' not in str(model):
+            raise ValueError("`refit_mode='filter'` is only supported by statsmodels models")
+        if refit_mode == 'warm' and _is_sklearn(model):
+            raise ValueError("scikit-learn models only support `refit_mode='cold'`")
+        if train_window and refit_mode != 'cold':
+            raise ValueError("'train_window' is only supported with `refit_mode='cold'`")
+        if not (type(cv_window) == int and 0 <= cv_window < len(data)):
+            raise ValueError(f"'cv_window' should be an `int` between 0 and {len(data)-1}")
+        
+        self.model = copy.deepcopy(model)
+        self.target_col, self.feature_cols = target_col, feature_cols
+        self.ahead_offest, self.model_params = ahead_offest, model_params
+        self.back_transform_func, self.refit_mode = back_transform_func, refit_mode
+        self.train_window, self.feature_params = train_window, feature_params
+        self.metrics = get_metrics(metric)
+        self.freq = data.index.freq
+        self.data = data.iloc[:len(data)-cv_window]
+        self.fitted_model, self._train_stop = None, None
+        self._sheets = []
+        self._aggregates = {k: RunningAggregate(k) for k in self.metrics}
+        
+        self._metric_ctx = dict(metric_params or {})
+        self._alpha = self._metric_ctx.pop('alpha', 0.05) if metrics_need(self.metrics, 'interval') else None
+        if metrics_need(self.metrics, 'scale') and 'scale' not in self._metric_ctx:
+            # MASE - scaled by the seasonal naive errors on the initial `data`, fixed from then on
+            _scale_target = data[target_col].values
+            if back_transform_func:
+                _scale_target = back_transform_func(_scale_target)
+            self._metric_ctx['scale'] = seasonal_naive_scale(_scale_target, m=self._metric_ctx.get('m', 1))
+        if cv_window:
+            self.update(data.iloc[len(data)-cv_window:])
+    
+    def update(self, new_rows):
+        if type(new_rows) != pd.core.frame.DataFrame or type(new_rows.index) != pd.core.indexes.datetimes.DatetimeIndex:
+            raise ValueError("'new_rows' should be a pandas dataframe with a 'pd.DatetimeIndex'")
+        if new_rows.empty:
+            return new_rows.iloc[:0]
+        new_rows = new_rows.sort_index()
+        if new_rows.index[0] <= self.data.index[-1]:
+            raise ValueError(f"'new_rows' should start after {self.data.index[-1]}")
+        
+        data = pd.concat([self.data, new_rows[self.data.columns]])
+        try:
+            data.index.freq = self.freq
+        except ValueError:
+            raise ValueError(f"'new_rows' does not follow the '{self.freq.freqstr}' frequency of `data`")
+        
+        _windows = _origin_windows(new_rows.index, data.index, data.index[0], self.ahead_offest,
+                                   train_window=self.train_window)
+        _design = None
+        if _is_sklearn(self.model):
+            _design = _sklearn_design(_windows, data, self.feature_cols, self.target_col, self.feature_params)
+        _sheets, self.fitted_model = _fit_predict_chunk(_windows, data, self.feature_cols, self.target_col,
+                                                        self.model, self.model_params, refit_mode=self.refit_mode,
+                                                        alpha=self._alpha, design=_design,
+                                                        prev_fit=self.fitted_model, prev_train_stop=self._train_stop)
+        self.data, self._train_stop = data, _windows[1][-1]
+        
+        sheet = _metric_sheets(_sheets, new_rows.index, self.metrics, self._metric_ctx,
+                               back_transform_func=self.back_transform_func)
+        for k in self.metrics:
+            self._aggregates[k].update(sheet[k].values)
+        self._sheets.append(sheet)
+        return sheet
+    
+    @property
+    def results(self):
+        # All the origins forecasted so far, like the CV sheet of `ro_framework`
+        if not self._sheets:
+            return pd.DataFrame(columns=['Actual', 'Forecast']+self.metrics, dtype=np.float64)
+        if len(self._sheets) > 1:
+            self._sheets = [pd.concat(self._sheets)]
+        return self._sheets[0]
+    
+    @property
+    def overall(self):
+        return pd.Series({'Overall '+k: self._aggregates[k].value for k in self.metrics}, name='Online')
 
 
 def residual_diagnostic(respack, training_target):
@@ -0,0 +1,160 @@
+import os
+import pickle
+import hashlib
+import inspect
+import functools
+from importlib import metadata
+import pandas as pd
+
+
+############################## FORECAST CACHE ##############################
+class ForecastCache:
+    '''
+    Content addressed on-disk cache of the per-origin forecasts of `ro_framework`.
+    Every origin is keyed by a hash of its training slice, its forecasting rows, the
+    model (its configuration & the library versions), `model_params` and the forecasting
+    options, so re-running a backtest only fits the origins that changed or are new.
+       Files are evicted least recently used first once `max_size_mb` is exceeded.
+    Fitted models are pickled along only with `store_models=True`.
+    '''
+    def __init__(self, cache_dir='../Prepared Data/forecast_cache', max_size_mb=512, store_models=False):
+        self.cache_dir = cache_dir
+        self.max_size = max_size_mb*1024**2
+        self.store_models = store_models
+        self._size = None
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def key(self, train_data, pred_data, model_token, model_params, **options):
+        # `model_token` - the model's identity, see `_model_token`
+        _hash = hashlib.sha1()
+        for _frame in (train_data, pred_data):
+            _hash.update(pd.util.hash_pandas_object(_frame, index=True).values.tobytes())
+            _hash.update(repr(list(_frame.columns)).encode())
+        _hash.update(model_token.encode())
+        _hash.update(repr(sorted((model_params or {}).items(), key=lambda x: x[0])).encode())
+        _hash.update(repr(sorted(options.items())).encode())
+        return _hash.hexdigest()
+
+    def get(self, key, need_model=False):
+        _path = self._path(key)
+        if not os.path.exists(_path):
+            return None
+        if need_model and not os.path.exists(_path+'.model'):
+            return None
+        try:
+            with open(_path, 'rb') as f:
+                _sheet = pickle.load(f)
+            _fitted_model = None
+            if need_model:
+                with open(_path+'.model', 'rb') as f:
+                    _fitted_model = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            # Evicted or half-written by a concurrent worker, treat as a miss
+            return None
+        # Mark as recently used
+        os.utime(_path)
+        return _sheet, _fitted_model
+
+    def put(self, key, sheet, fitted_model=None):
+        _path = self._path(key)
+        _written = self._write(_path, sheet)
+        if self.store_models and fitted_model is not None:
+            try:
+                _written += self._write(_path+'.model', fitted_model)
+            except (pickle.PicklingError, TypeError, AttributeError):
+                # Not every fitted model can be pickled, the forecasts are still cached
+                pass
+
+        if self._size is None:
+            self._size = self.size()
+        else:
+            self._size += _written
+        if self._size > self.max_size:
+            self.evict()
+
+    def size(self):
+        return sum(e.stat().st_size for e in os.scandir(self.cache_dir) if e.is_file())
+
+    def evict(self, target=0.9):
+        # Least recently used first, down to `target` fraction of the cap
+        _entries = sorted((e for e in os.scandir(self.cache_dir) if e.is_file() and not e.name.endswith('.model')),
+                          key=lambda e: e.stat().st_mtime)
+        self._size = self.size()
+        for _entry in _entries:
+            if self._size <= self.max_size*target:
+                break
+            for _path in (_entry.path, _entry.path+'.model'):
+                try:
+                    self._size -= os.path.getsize(_path)
+                    os.remove(_path)
+                except OSError:
+                    pass
+
+    def clear(self):
+        for _entry in os.scandir(self.cache_dir):
+            if _entry.is_file():
+                os.remove(_entry.path)
+        self._size = 0
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key)
+
+    def _write(self, path, obj):
+        # Write-then-rename so that parallel workers never read partial files
+        _tmp = '{0}.{1}.tmp'.format(path, os.getpid())
+        with open(_tmp, 'wb') as f:
+            pickle.dump(obj, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(_tmp, path)
+        return os.path.getsize(path)
+
+
+def _model_token(model, cache_key=None):
+    # The model's identity in the cache keys, resolved once per backtest. It is built from
+    # stable configuration only (nothing session specific, e.g memory addresses):
+    #  - an explicit `cache_key`, else
+    #  - statsmodels classes - their import path
+    #  - scikit-learn estimators - their constructor params, thread counts aside
+    #  - model generators (Prophet) - the code of their class & their attributes
+    # along with the installed versions of the modelling libraries.
+    _cls = model if inspect.isclass(model) else type(model)
+    _token = [_cls.__module__, _cls.__qualname__]
+    if cache_key is not None:
+        _token.append('key='+str(cache_key))
+    elif inspect.isclass(model):
+        if _cls.__module__ == '__main__':
+            raise ValueError(f"'{_cls.__qualname__}' is defined in `__main__`, identify it in the cache by a `cache_key`")
+    elif hasattr(model, 'get_params'):
+        _params = sorted((k, v) for k, v in model.get_params().items() if not k.endswith('n_jobs'))
+        _token.append(_stable_repr(_params, model))
+    else:
+        for _base in _cls.__mro__[:-1]:
+            _token += [_code_token(v.__code__) for k, v in sorted(vars(_base).items()) if inspect.isfunction(v)]
+        _token.append(_stable_repr(sorted(vars(model).items()), model))
+    _token += [k+'=='+str(v) for k, v in _library_versions().items()]
+    return '|'.join(_token)
+
+
+def _stable_repr(values, model):
+    _repr = repr(values)
+    if ' at 0x' in _repr:
+        # Default reprs hold memory addresses, which change from one session to the next
+        raise ValueError(f"'{type(model).__qualname__}' has no stable identity for the cache, pass a `cache_key`")
+    return _repr
+
+
+def _code_token(code):
+    # Bytecode, constants & names - unlike the source, available for classes defined in `__main__` too
+    _consts = [_code_token(k) if inspect.iscode(k) else repr(k) for k in code.co_consts]
+    return repr((code.co_code.hex(), _consts, code.co_names))
+
+
+@functools.lru_cache(maxsize=None)
+def _library_versions():
+    # Installed (not just imported) versions, so the keys are the same in every session & worker
+    _versions = {}
+    for _dist in ('numpy', 'pandas', 'statsmodels', 'scikit-learn', 'prophet', 'fbprophet'):
+        try:
+            _versions[_dist] = metadata.version(_dist)
+        except metadata.PackageNotFoundError:
+            _versions[_dist] = None
+    return _versions
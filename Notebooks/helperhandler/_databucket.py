@@ -1,6 +1,11 @@
+import os
+import time
 import pandas as pd
-from tqdm.notebook import tqdm
+from contextlib import nullcontext
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
 from ._individual_funcs import *
+from ._prepared import prepared_signature, read_prepared, write_prepared
+from ._lazy import tqdm
 
 ############################## DATA PATHS ##############################
 # Retail Sales Data
@@ -37,20 +42,76 @@ elecprod_datapath = '../Raw Data/Australlian_Monthly_Electricity_Production_Bill
 antidiabetic_datapath = '../Raw Data/AntiDiabetic_DrugSales_Mn.csv'
 # Australlian Visitors
 visitors20r_datapath = '../Raw Data/Australlia_Vistors_20Regions_Million.csv'
+# Mars Ephemeris, JPL Horizons text export
+marshorizons_datapath = '../Raw Data/horizons_results.txt'
+# Mars Declination, JPL
+marsjpl_datapath = '../Raw Data/mars_jpldata.csv'
+
+# Binary cache of the processed datasets
+prepared_datapath = '../Prepared Data/'
 
 
 class DataProcessingClass:
-    def __init__(self, raw_datapath, long_desc, short_desc, processing_func, plotfunc):
+    def __init__(self, raw_datapath, long_desc, short_desc, processing_func, plotfunc,
+                 prepared_dir=prepared_datapath, heavy=False, panel=None):
         self.rpath = raw_datapath
         self.long_description = long_desc
         self.short_description = short_desc
         self._processing_func = processing_func
         self._plot_func = plotfunc
+        # CPU bound processing, worth a separate process in `DataHolderClass.load_data`
+        self.heavy = heavy
+        # Long panel datasets - the `dense_panel` params (keys, value & time) of their dense layout
+        self.panel = panel
+        self.prepared_path = None
+        if prepared_dir:
+            self.prepared_path = os.path.join(prepared_dir, processing_func.__name__)
         
-        self.data = None
+        self._data = None
+        self._dense = None
+    
+    @property
+    def data(self):
+        # Processed on first access & memoized
+        if self._data is None:
+            self.run_processingfunc()
+        return self._data
+    
+    @data.setter
+    def data(self, value):
+        self._data = value
+        self._dense = None
+    
+    @property
+    def dense(self):
+        # (time x series) frame of a panel dataset, built once from the long data
+        if self.panel is None:
+            raise ValueError(f"'{self.short_description}' is not a panel dataset")
+        if self._dense is None:
+            self._dense = dense_panel(self.data, **self.panel)
+        return self._dense
+    
+    @property
+    def is_loaded(self):
+        return self._data is not None
         
-    def run_processingfunc(self):
-        self.data = self._processing_func(self.rpath)
+    def run_processingfunc(self, use_prepared=True):
+        # Reuse the binary prepared copy while the raw file & processing function are unchanged
+        self._dense = None
+        use_prepared = use_prepared and self.prepared_path is not None
+        if use_prepared:
+            _signature = prepared_signature(self.rpath, self._processing_func)
+            self._data = read_prepared(self.prepared_path, _signature)
+            if self._data is not None:
+                return
+        
+        self._data = self._processing_func(self.rpath)
+        if use_prepared:
+            try:
+                write_prepared(self.prepared_path, _signature, self._data)
+            except OSError:
+                # Read-only checkout, keep working without the prepared copy
+                pass
         
     def exploratory_plot(self):
         self._plot_func(self.data, style='ggplot')
@@ -59,21 +120,80 @@ class DataProcessingClass:
 class DataHolderClass:
     def __init__(self):
         self.bucket = {}
-        self.dataDf = pd.DataFrame(columns=['Handle', 'Short Description'])
+        # Status & timing of the last `load_data`
+        self.loadDf = None
         
     def add_data(self, data_key, dpc_ob):
         self.bucket[data_key] = dpc_ob
-        self.dataDf = self.dataDf.append({'Handle':data_key,
-                                          'Short Description':dpc_ob.short_description},
-                                          ignore_index=True)
+    
+    @property
+    def dataDf(self):
+        # Built from the bucket on access, in the order the datasets were added
+        return pd.DataFrame({'Handle': list(self.bucket),
+                             'Short Description': [k.short_description for k in self.bucket.values()]})
 
-    def load_data(self):
-        for _, edpc in tqdm(self.bucket.items()):
-            edpc.run_processingfunc()
+    def load_data(self, keys=None, n_jobs=None, use_processes=False):
+        # Eagerly (re)process the given datasets, all of them by default, concurrently.
+        # The (I/O bound) reads run on a thread pool, with `use_processes` the `heavy`
+        # processing functions run on a process pool instead. A failing dataset does not
+        # stop the others, the returned report has the status & timing of every dataset.
+        keys = list(self.bucket) if keys is None else keys
+        missing_keys = [k for k in keys if k not in self.bucket]
+        if missing_keys:
+            raise KeyError(f"{missing_keys} not found, available datasets are {list(self.bucket)}")
+        
+        process_keys = [k for k in keys if use_processes and self.bucket[k].heavy]
+        report = {}
+        with ThreadPoolExecutor(max_workers=n_jobs) as threads, \
+             (ProcessPoolExecutor(max_workers=n_jobs) if process_keys else nullcontext()) as processes:
+            futures = {(processes if k in process_keys else threads).submit(_timed_processing, self.bucket[k]): k
+                       for k in keys}
+            for future in tqdm(as_completed(futures), total=len(futures)):
+                k = futures[future]
+                try:
+                    data, seconds = future.result()
+                except Exception as e:
+                    report[k] = {'Status': 'Failed', 'Seconds': float('nan'), 'Error': repr(e)}
+                    continue
+                # Process pool workers processed a copy
+                self.bucket[k].data = data
+                report[k] = {'Status': 'Loaded', 'Seconds': seconds, 'Error': ''}
+        
+        self.loadDf = pd.DataFrame.from_dict(report, orient='index').loc[keys]
+        self.loadDf.index.name = 'Handle'
+        return self.loadDf
+    
+    def keys(self):
+        return list(self.bucket)
+    
+    def __contains__(self, data_key):
+        return data_key in self.bucket
+    
+    def __getitem__(self, data_key):
+        # Lazy access - `dataHolder['sunspots']` parses only the sunspots data, once
+        if data_key not in self.bucket:
+            raise KeyError(f"{data_key} not found, available datasets are {list(self.bucket)}")
+        return self.bucket[data_key].data
+    
+    def __getattr__(self, name):
+        # Lazy access - `dataHolder.sunspots`, only called when normal attribute lookup fails
+        bucket = self.__dict__.get('bucket', {})
+        if name in bucket:
+            return bucket[name].data
+        raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
+    
+    def __dir__(self):
+        return list(super().__dir__()) + list(self.__dict__.get('bucket', {}))
             
             
             
             
+def _timed_processing(dpc_ob):
+    _start = time.perf_counter()
+    dpc_ob.run_processingfunc()
+    return dpc_ob.data, time.perf_counter()-_start
+
+
 dpc1 = DataProcessingClass(raw_datapath=airpassengers_datapath, 
                            long_desc = """Air Passengers (Monthly), Numbers in 1000's, from 1949 to 1960""",
                            short_desc = "Air Passengers",
@@ -98,7 +218,9 @@ dpc4 = DataProcessingClass(raw_datapath=cpi_datapath,
                            long_desc = """India's Consumer Price index Data (Monthly), with groups and subgroups starting from 2013 to 2020""",
                            short_desc = "India CPI",
                            processing_func = process_indiacpi,
-                           plotfunc = plot_indiacpi)
+                           plotfunc = plot_indiacpi,
+                           heavy = True,
+                           panel = {'keys': ['State', 'Description'], 'value': 'Combined', 'time': 'Date'})
 
 
 dpc5 = DataProcessingClass(raw_datapath=beerprod_datapath, 
@@ -112,7 +234,8 @@ dpc6 = DataProcessingClass(raw_datapath=houseprices_datapath,
                            long_desc = """USA Housing Prices Data (Monthly), prices in $, from 2008 to 2020""",
                            short_desc = "Housing Prices",
                            processing_func = process_housingprices,
-                           plotfunc = plot_housingprices)
+                           plotfunc = plot_housingprices,
+                           heavy = True)
 
 dpc7 = DataProcessingClass(raw_datapath=airgap_datapath, 
                            long_desc = """Air Passengers (Monthly) with Missing Values, Numbers in 1000's, from 1949 to 1960""",
@@ -158,7 +281,8 @@ dpc13 = DataProcessingClass(raw_datapath=visitors20r_datapath,
                            long_desc = """Number of Visitors in 20 Regions of Australlia (Quaterly), in Million, from 1998 to 2016""",
                            short_desc = "Visitors to 20 Regions",
                            processing_func = process_20rvisitors,
-                           plotfunc = plot_20rvisitors)
+                           plotfunc = plot_20rvisitors,
+                           panel = {'keys': 'Regions', 'value': 'Visitors'})
 
 dpc14 = DataProcessingClass(raw_datapath=usa_cipsu_datapath, 
                            long_desc = """USA Economic Numbers  (Quaterly), in Million, from 1970 to 2016""",
@@ -177,7 +301,20 @@ dpc16 = DataProcessingClass(raw_datapath=retail_sales_datapath,
 data which was maked (https://www.kaggle.com/manjeetsingh/retaildataset), from 2010 to 2012""",
                            short_desc = "Retail Sales",
                            processing_func = process_retailsales,
-                           plotfunc = plot_retialsales)
+                           plotfunc = plot_retialsales,
+                           panel = {'keys': 'Store', 'value': 'Weekly_Sales'})
+
+dpc17 = DataProcessingClass(raw_datapath=marshorizons_datapath, 
+                           long_desc = """Mars Ephemeris from JPL Horizons (Weekly), Right Ascension in hours & Declination in degrees, from 1600 to 2020 (https://ssd.jpl.nasa.gov/horizons.cgi)""",
+                           short_desc = "Mars Ephemeris - Horizons",
+                           processing_func = process_marshorizons,
+                           plotfunc = plot_marshorizons)
+
+dpc18 = DataProcessingClass(raw_datapath=marsjpl_datapath, 
+                           long_desc = """Mars Declination from JPL (Weekly), in degrees, from 1600 to 2020""",
+                           short_desc = "Mars Declination - JPL",
+                           processing_func = process_marsjpl,
+                           plotfunc = plot_marsjpl)
 
     
 dataHolder = DataHolderClass()
@@ -197,5 +334,7 @@ dataHolder.add_data(data_key='visitor_20r', dpc_ob=dpc13)
 dataHolder.add_data(data_key='usa_economic', dpc_ob=dpc14)
 dataHolder.add_data(data_key='sunspots', dpc_ob=dpc15)
 dataHolder.add_data(data_key='retail_sales', dpc_ob=dpc16)
+dataHolder.add_data(data_key='mars_horizons', dpc_ob=dpc17)
+dataHolder.add_data(data_key='mars_jpl', dpc_ob=dpc18)
 
 
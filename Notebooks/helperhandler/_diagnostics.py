@@ -0,0 +1,209 @@
+import os
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from ._lazy import LazyModule
+
+# Imported on first use
+_stats = LazyModule('scipy.stats')
+_mpl_figure = LazyModule('matplotlib.figure')
+_mpl_agg = LazyModule('matplotlib.backends.backend_agg')
+
+############################## RESIDUAL DIAGNOSTICS ##############################
+# Everything `residual_diagnostic` draws, computed vectorized once per residual series:
+# the ACF through an FFT, QQ quantiles & the histogram/KDE on a binned grid. Long series
+# are reduced to `max_points` (min/max per bucket) before plotting, and the figures are
+# drawn on a bare Agg canvas, so they render the same in worker processes & without display.
+
+
+def residual_stats(respack, nlags=10, lb_lags=10):
+    '''
+    Numbers only diagnostics of a `ro_framework` result pack, one row per split ('CV', 'Test'):
+    residual moments, Ljung-Box (autocorrelation up to `lb_lags`), Jarque-Bera (normality)
+    & the residual ACF up to `nlags`.
+    '''
+    return pd.DataFrame({split: _residual_numbers(residuals, nlags, lb_lags)['stats']
+                         for split, residuals in _pack_residuals(respack).items()}).T
+
+
+def residual_diagnostic_batch(respacks, training_target=None, out_dir=None, n_jobs=1, stats_only=False,
+                              max_points=2000, nlags=24, lb_lags=10, fmt='png', dpi=100):
+    '''
+    Diagnostics of many `ro_framework` result packs, `respacks` being a dict {name: respack}
+    (or a list, named by position). With `stats_only` nothing is drawn, otherwise every pack
+    is rendered to `out_dir/<name>.<fmt>`, by `n_jobs` worker processes.
+    `training_target` - the actual series (shared) or a dict {name: series} of them.
+    Returns the statistics of `residual_stats`, one row per (name, split), and with the
+    figures the path of each in 'Figure'.
+    '''
+    if not isinstance(respacks, dict):
+        respacks = dict(enumerate(respacks))
+    if not stats_only and out_dir is None:
+        raise ValueError("'out_dir' is needed to render the figures, or use `stats_only=True`")
+    if not (n_jobs == -1 or (type(n_jobs) == int and n_jobs > 0)):
+        raise ValueError("'n_jobs' should be a positive `int` or -1 (all cores)")
+    if out_dir is not None:
+        os.makedirs(out_dir, exist_ok=True)
+
+    jobs = []
+    for name, respack in respacks.items():
+        target = training_target.get(name) if isinstance(training_target, dict) else training_target
+        path = None if stats_only else os.path.join(out_dir, '{0}.{1}'.format(name, fmt))
+        jobs.append((respack, target, path, dict(max_points=max_points, nlags=nlags, lb_lags=lb_lags, dpi=dpi)))
+
+    if n_jobs == 1 or len(jobs) < 2:
+        results = [_diagnostic_job(*job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=os.cpu_count() if n_jobs == -1 else n_jobs) as executor:
+            results = list(executor.map(_diagnostic_job, *zip(*jobs)))
+
+    stats = pd.concat({name: result for name, result in zip(respacks, results)}, names=['Name', 'Split'])
+    return stats
+
+
+def _diagnostic_job(respack, training_target, path, options):
+    splits = _pack_residuals(respack)
+    numbers = {split: _residual_numbers(residuals, options['nlags'], options['lb_lags'],
+                                        options['max_points'])
+               for split, residuals in splits.items()}
+    stats = pd.DataFrame({split: v['stats'] for split, v in numbers.items()}).T
+    if path is not None:
+        _render(respack, training_target, numbers, path, options['max_points'], options['dpi'])
+        stats['Figure'] = path
+    return stats
+
+
+def _pack_residuals(respack):
+    cvdf, testdf = respack[0], respack[1]
+    if isinstance(cvdf.columns, pd.MultiIndex):
+        raise ValueError("Residual diagnostics need single step results, i.e `ro_framework` without `horizons`")
+    splits = {'CV': cvdf['Actual']-cvdf['Forecast']}
+    if not testdf.empty:
+        splits['Test'] = testdf['Actual']-testdf['Forecast']
+    return splits
+
+
+def _residual_numbers(residuals, nlags=24, lb_lags=10, max_points=2000, grid_size=256):
+    x = np.asarray(residuals, dtype=np.float64)
+    x = x[np.isfinite(x)]
+    n = len(x)
+    stats = {'Observations': n}
+    if n < 3:
+        return {'stats': stats}
+
+    mean, std = x.mean(), x.std()
+    z = (x-mean)/std if std > 0 else x-mean
+    skew, kurt = np.mean(z**3), np.mean(z**4)-3
+    acf = _acf_fft(x, min(max(nlags, lb_lags), n-1))
+
+    # Ljung-Box & Jarque-Bera, from the moments & ACF above
+    _lb_lags = min(lb_lags, n-1)
+    _k = np.arange(1, _lb_lags+1)
+    lb = n*(n+2)*np.sum(acf[_k]**2/(n-_k))
+    jb = n/6*(skew**2+kurt**2/4)
+    stats.update({'Mean': mean, 'Std': std, 'Skew': skew, 'Excess Kurtosis': kurt,
+                  'Ljung-Box Q': lb, 'Ljung-Box p-value': _stats.chi2.sf(lb, _lb_lags),
+                  'Jarque-Bera': jb, 'Jarque-Bera p-value': _stats.chi2.sf(jb, 2)})
+    stats.update({'ACF {}'.format(k): acf[k] if k < len(acf) else np.nan for k in range(1, nlags+1)})
+
+    # QQ - at most `max_points` quantiles of the standardised residuals
+    n_q = min(n, max_points)
+    probs = (np.arange(1, n_q+1)-0.5)/n_q
+    qq = (_stats.norm.ppf(probs), np.quantile(z, probs))
+
+    # Histogram & a Gaussian KDE (Scott's bandwidth) of the linearly binned residuals
+    hist = np.histogram(x, bins=min(50, max(10, int(np.sqrt(n)))), density=True)
+    bw = 1.06*std*n**(-1/5) if std > 0 else 1.0
+    grid = np.linspace(x.min()-3*bw, x.max()+3*bw, grid_size)
+    delta = grid[1]-grid[0]
+    pos = (x-grid[0])/delta
+    lo = np.clip(np.floor(pos).astype(int), 0, grid_size-2)
+    frac = pos-lo
+    counts = np.bincount(lo, 1-frac, grid_size)+np.bincount(lo+1, frac, grid_size)
+    half = int(np.ceil(4*bw/delta))
+    kernel = np.exp(-0.5*(np.arange(-half, half+1)*delta/bw)**2)/(bw*np.sqrt(2*np.pi))
+    kde = (grid, np.convolve(counts, kernel)[half:half+grid_size]/n)
+
+    return {'stats': stats, 'acf': acf[:nlags+1], 'qq': qq, 'hist': hist, 'kde': kde, 'n': n}
+
+
+def _acf_fft(x, nlags):
+    # Biased ACF (as statsmodels' `acf`), through a zero padded FFT
+    x = x-x.mean()
+    n = len(x)
+    size = 1 << (2*n-1).bit_length()
+    spectrum = np.fft.rfft(x, size)
+    acov = np.fft.irfft(spectrum*np.conj(spectrum), size)[:nlags+1]/n
+    return acov/acov[0] if acov[0] > 0 else np.full(nlags+1, np.nan)
+
+
+def _downsample(series, max_points):
+    # The min & max of each of `max_points/2` buckets, keeps the envelope of long series
+    series = series.dropna()
+    n = len(series)
+    if n <= max_points:
+        return series
+    size = -(-n//(max_points//2))
+    n_buckets = -(-n//size)
+    buckets = np.full(n_buckets*size, np.nan)
+    buckets[:n] = series.values
+    buckets = buckets.reshape(n_buckets, size)
+    starts = np.arange(n_buckets)*size
+    idx = np.unique(np.concatenate([starts+np.nanargmin(buckets, axis=1), starts+np.nanargmax(buckets, axis=1)]))
+    return series.iloc[idx]
+
+
+def _render(respack, training_target, numbers, path, max_points=2000, dpi=100):
+    cvdf, testdf, odf = respack[0], respack[1], respack[2]
+    _metric = odf.columns[0]
+    splits = [('CV', 'Cross Validation', cvdf)]
+    if 'Test' in numbers:
+        splits.append(('Test', 'Test', testdf))
+
+    fig = _mpl_figure.Figure(figsize=(15, 15))
+    _mpl_agg.FigureCanvasAgg(fig)
+    grid = fig.add_gridspec(2+2*len(splits), 3, wspace=0.2, hspace=0.5)
+
+    # Time Series Plot
+    ts_axes = fig.add_subplot(grid[:2, :])
+    if training_target is not None:
+        ts_axes.plot(_downsample(training_target, max_points), label='Actual')
+    ts_axes.plot(_downsample(cvdf.Forecast, max_points), color='#aa8ede', label='CV Preidictions')
+    if 'Test' in numbers:
+        ts_axes.plot(_downsample(testdf.Actual, max_points), color='#314d2c', label='Test Actual', linestyle=':')
+        ts_axes.plot(_downsample(testdf.Forecast, max_points), color='#fab09b', label='Test Forecast', linewidth=3)
+        _err = testdf.Forecast.expanding().std()*1.96
+        _band = pd.DataFrame({'lower': testdf.Forecast-_err, 'upper': testdf.Forecast+_err})
+        _step = max(1, len(_band)//max_points)
+        ts_axes.fill_between(_band.index[::_step], _band.lower.values[::_step], _band.upper.values[::_step],
+                             alpha=0.3, color='lightgray', label='Prediction Interval')
+    ts_axes.legend()
+    ts_axes.set_title('Actual Series + CV Predictions + Test Forecasts', loc='left')
+
+    for i, (split, label, df) in enumerate(splits):
+        tse_axes = fig.add_subplot(grid[2+2*i, :])
+        dis_axes = fig.add_subplot(grid[3+2*i, 0])
+        qqp_axes = fig.add_subplot(grid[3+2*i, 1])
+        acf_axes = fig.add_subplot(grid[3+2*i, 2])
+        num = numbers[split]
+
+        tse_axes.plot(_downsample(df['Actual']-df['Forecast'], max_points))
+        tse_axes.set_title('{0} - {1} - {2:.3f}'.format(label, _metric, odf.loc[split, _metric]), loc='left')
+        tse_axes.set_ylabel('Residuals')
+        if 'acf' in num:
+            _counts, _edges = num['hist']
+            dis_axes.bar(_edges[:-1], _counts, width=np.diff(_edges), align='edge', alpha=0.4)
+            dis_axes.plot(*num['kde'])
+            qqp_axes.scatter(*num['qq'], s=6, color='w', edgecolors='tab:blue')
+            _lim = [np.min(num['qq'][0]), np.max(num['qq'][0])]
+            qqp_axes.plot(_lim, _lim, color='r')
+            _lags = np.arange(len(num['acf']))
+            acf_axes.vlines(_lags, 0, num['acf'])
+            acf_axes.scatter(_lags, num['acf'], s=10)
+            acf_axes.axhspan(-1.96/np.sqrt(num['n']), 1.96/np.sqrt(num['n']), alpha=0.2)
+        dis_axes.set_title('{} - Distribution'.format(label), loc='left')
+        qqp_axes.set_title('{} - QQ'.format(label), loc='left')
+        acf_axes.set_title('{} - ACF'.format(label), loc='left')
+
+    fig.suptitle('Model \nDiagnostic', fontsize=25)
+    fig.savefig(path, dpi=dpi)
@@ -0,0 +1,56 @@
+import numpy as np
+import pandas as pd
+
+############################## LAG FEATURES ##############################
+# Design matrix of the scikit-learn models in `ro_framework`, built once for the
+# whole series so that every origin only slices rows, i.e `fit(X[b:k], y[b:k])`.
+# The target derived columns are lagged by `offset` extra rows, so that no row can
+# see an observation past the training cutoff of the origin that forecasts it.
+_default_feature_params = {'lags': (1, 2, 3), 'windows': (), 'calendar': True}
+
+
+def lag_feature_matrix(data, target_col, feature_cols=None, offset=0,
+                       lags=(1, 2, 3), windows=(), calendar=True):
+    """
+    Returns (X, columns, first_row)
+    X         - float64 array (len(data) x features) of target lags, rolling means of
+                the last available target, calendar columns & the `feature_cols` as is
+    first_row - first row with all the lags & rolling means available
+    """
+    y = data[target_col].to_numpy(dtype=np.float64)
+    columns, blocks = [], []
+    for k in lags:
+        columns.append(f'lag_{offset+k}')
+        blocks.append(_shift(y, offset+k))
+    _last = _shift(y, offset+1)
+    for w in windows:
+        columns.append(f'roll_mean_{w}_lag_{offset+1}')
+        blocks.append(pd.Series(_last).rolling(w).mean().to_numpy())
+    if calendar:
+        for name, values in _calendar_columns(data.index):
+            columns.append(name)
+            blocks.append(values)
+    for col in feature_cols or []:
+        columns.append(col)
+        blocks.append(data[col].to_numpy(dtype=np.float64))
+
+    X = np.column_stack(blocks) if blocks else np.empty((len(y), 0))
+    first_row = min(len(y), offset+max(list(lags)+list(windows)+[0]))
+    return X, columns, first_row
+
+
+def _shift(y, k):
+    out = np.full(len(y), np.nan)
+    if k < len(y):
+        out[k:] = y[:len(y)-k]
+    return out
+
+
+def _calendar_columns(index):
+    # Only the calendar fields finer than a period of the series, e.g no month for yearly data
+    if len(index) < 2:
+        return []
+    _step = pd.Timedelta(np.median(np.diff(index.asi8)))
+    _fields = [('month', pd.Timedelta(days=365)), ('dayofweek', pd.Timedelta(days=7)),
+               ('hour', pd.Timedelta(days=1))]
+    return [(name, getattr(index, name).to_numpy(dtype=np.float64)) for name, period in _fields if _step < period]
@@ -1,23 +1,79 @@
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
-import mplfinance as mpl
-plt.rcParams['legend.facecolor'] = 'darkgray'
+from ._lazy import LazyModule
+from ._readers import ChunkedReader, HorizonsReader
+
+# Plotting libraries, imported on the first plot
+def _set_rcparams(plt):
+    plt.rcParams['legend.facecolor'] = 'darkgray'
+plt = LazyModule('matplotlib.pyplot', on_load=_set_rcparams)
+sns = LazyModule('seaborn')
+mpl = LazyModule('mplfinance')
+
+
+############################## PANEL HELPERS ##############################
+def dense_panel(data, keys, value, time=None, dtype=np.float32):
+    '''
+    Long panel `data` (one row per time & series) -> dense (time x series) frame of `value`,
+    one column per distinct `keys`. The times are the index of `data`, or its `time` column.
+    The NumPy block is filled by position from the factorized time & keys, no groupby/pivot.
+    Missing (time, series) pairs are NaN.
+    '''
+    keys = [keys] if isinstance(keys, str) else list(keys)
+    _time = data.index if time is None else data[time]
+    _t_codes, _times = pd.factorize(_time, sort=True)
+    if len(keys) == 1:
+        _s_codes, _series = pd.factorize(data[keys[0]], sort=True)
+        _series = pd.Index(_series, name=keys[0])
+    else:
+        _s_codes, _series = pd.factorize(pd.MultiIndex.from_frame(data[keys]), sort=True)
+        _series = pd.MultiIndex.from_tuples(_series, names=keys)
+    # Rows missing their time or keys are left out
+    _valid = (_t_codes >= 0) & (_s_codes >= 0)
+    _flat = _t_codes[_valid].astype(np.int64)*len(_series)+_s_codes[_valid]
+    if len(np.unique(_flat)) < len(_flat):
+        raise ValueError(f"`data` has more than one row per time & {keys}")
+    
+    values = np.full((len(_times), len(_series)), np.nan, dtype=dtype)
+    values.ravel()[_flat] = data[value].to_numpy(dtype=dtype)[_valid]
+    return pd.DataFrame(values, index=pd.Index(_times, name=_time.name), columns=_series)
+
+
+def _compact(data):
+    # Categorical strings, float32 measures & the smallest integer type of every integer column
+    for col in data.columns:
+        if data[col].dtype == object:
+            data[col] = data[col].astype('category')
+        elif data[col].dtype.kind == 'f':
+            data[col] = data[col].astype(np.float32)
+        elif data[col].dtype.kind in 'iu':
+            data[col] = pd.to_numeric(data[col], downcast='integer')
+    return data
+
+
+def _parse_unique(values, parser):
+    # Parses the distinct values only (dates, month names) & maps them back by their codes
+    _codes, _uniques = pd.factorize(values)
+    return parser(pd.Index(_uniques)).take(_codes, allow_fill=True, fill_value=pd.NaT)
 
 
 ############################## RETAIL SALES ##############################
-def process_retailsales(path):
-    data = pd.read_csv(path, index_col=0, parse_dates=True)
+def process_retailsales(path, dense=False):
+    data = pd.read_csv(path, index_col=0, parse_dates=True, dtype={'IsHoliday': 'boolean'})
     data = data.drop('Date', axis=1)
-    data.IsHoliday = data.IsHoliday.apply(lambda x : int(x) if not pd.isna(x) else np.nan)
+    # 1/0, NaN for the missing weeks
+    data.IsHoliday = data.IsHoliday.astype(np.float32)
+    data.Store = data.Store.astype('category')
+    data = _compact(data)
+    if dense:
+        return dense_panel(data, 'Store', 'Weekly_Sales')
     return data
     
 def plot_retialsales(data, style='ggplot'):
     plt.rcParams['figure.dpi'] = 100
     plt.rcParams['figure.figsize'] = (15,7)
     plt.style.use(style)
-    _=data.groupby('Store').Weekly_Sales.plot(title='Weekly Sales all stores')
+    _=dense_panel(data, 'Store', 'Weekly_Sales').plot(title='Weekly Sales all stores', legend=False)
     _=plt.xlabel('Dates')
     _=plt.ylabel('Qty')
     
@@ -57,19 +113,22 @@ def plot_usaeconomic(data, style='ggplot'):
     
 
 ############################## VISITORS TO 20 REGIONS ##############################
-def process_20rvisitors(path):
-    data = pd.read_csv(path, index_col=0, parse_dates=True)
-    data.index=pd.to_datetime(data.index.str.replace(' ',''))
+def process_20rvisitors(path, dense=False):
+    data = pd.read_csv(path, index_col=0)
+    # '1998 Q1' -> 1998-01-01, each of the distinct quarters parsed once
+    data.index = _parse_unique(data.index, lambda x: pd.to_datetime(x.str.replace(' ','')))
     data.columns = ['Regions', 'Visitors']
     data.index.name = 'Quarter'
-    
+    data = _compact(data)
+    if dense:
+        return dense_panel(data, 'Regions', 'Visitors')
     return data
     
 def plot_20rvisitors(data, style='ggplot'):
     plt.rcParams['figure.dpi'] = 100
     plt.rcParams['figure.figsize'] = (15,7)
     plt.style.use(style)
-    _=sns.lineplot(x='Quarter', y='Visitors', hue='Regions', data=data.reset_index())
+    _=dense_panel(data, 'Regions', 'Visitors').plot()
     _=plt.title('Quaterly Vistors to 20 regions in Australlia')
     _=plt.ylabel('Visitors (Million)')
     
@@ -174,14 +233,19 @@ def process_housingprices(path):
     data = pd.read_csv(path, index_col=0)
     data = data.drop(['RegionID', 'SizeRank', 'StateName'], axis=1)
     data = data[~data.RegionName.duplicated()]
-    data = data.melt(id_vars='RegionName')
-    data.columns=['Region', 'Month', 'Price']
-    persistent_regions = set(data.Region.unique())
-    for eset in data.dropna().groupby('Month').Region.unique().apply(set):
-        persistent_regions = persistent_regions.difference(persistent_regions.difference(eset))
-    data=data[data.Region.isin(persistent_regions)].copy()
-    data.index = pd.to_datetime(data.Month)
-    data.drop('Month', axis=1, inplace=True)
+    data = data.set_index('RegionName')
+    # Persistent regions - priced in every month that has any price at all
+    prices = data.notna()
+    persistent_regions = prices.loc[:, prices.any(axis=0)].all(axis=1)
+    data = data[persistent_regions.values]
+    
+    # Melt (month-major, like `DataFrame.melt`) with compact dtypes, parsing each month only once
+    n_regions, n_months = data.shape
+    months = pd.to_datetime(data.columns)
+    region = pd.Categorical.from_codes(np.tile(np.arange(n_regions), n_months), categories=data.index)
+    price = data.to_numpy(dtype=np.float32).ravel(order='F')
+    data = pd.DataFrame({'Region': region, 'Price': price},
+                        index=pd.DatetimeIndex(months.repeat(n_regions), name='Month'))
 
     return data
     
@@ -190,6 +254,7 @@ def plot_housingprices(data, style='ggplot'):
     plt.rcParams['figure.figsize'] = (15,7)
     plt.style.use(style)
     pltdata = data.copy()
+    pltdata['Region'] = pltdata.Region.astype(str) # Only the picked regions in the legend
     random_regions = np.random.choice(pltdata.Region,10) # Pick 10 random regions
     pltdata = pltdata[pltdata.Region.isin(random_regions)]
     _=sns.lineplot(x='Month', y='Price', data=pltdata, hue='Region',
@@ -200,31 +265,33 @@ def plot_housingprices(data, style='ggplot'):
     
 
 ############################## USA HOUSING PRICES ##############################
-def process_indiacpi(path):
+def process_indiacpi(path, dense=False):
     
     data = pd.read_csv(path, header=[1])
     data = data.reset_index()
     data = data.drop(['index', 'Group', 'Sub Group', 'Status'], axis=1) # Unrequired Columns
     data = data.dropna(how='all', axis=1)
-    data['Month'] = pd.to_datetime(data.Month, format='%B').dt.month
-    data['Day'] = '01'
+    # Month names parsed once per distinct name
+    _month = _parse_unique(data.Month, lambda x: pd.to_datetime(x, format='%B')).month
     # Create Date
-    data['Date'] = pd.to_datetime(data[['Year', 'Month', 'Day']])
-    data.drop(['Year', 'Month', 'Day'], axis=1, inplace=True)
-
+    data['Date'] = pd.to_datetime(pd.DataFrame({'year': data.Year, 'month': _month, 'day': 1}))
+    data.drop(['Year', 'Month'], axis=1, inplace=True)
+    data = _compact(data)
+    if dense:
+        return dense_panel(data, ['State', 'Description'], 'Combined', time='Date')
     return data
     
 def plot_indiacpi(data, style='ggplot'):
     plt.rcParams['figure.dpi'] = 100
     plt.rcParams['figure.figsize'] = (15,7)
     plt.style.use(style)
-    pltdata=data.set_index('Date').copy()
+    pltdata=data.set_index('Date')
     pltdata=pltdata[pltdata.State.isin(['Delhi', 'Uttar Pradesh'])]
     pltdata=pltdata[pltdata.Description.isin(['Health', 'Meat and fish', 'Spices',
                                         'Clothing and footwear', 'Housing',
                                         'Fuel and light','Vegetables'])]
 
-    _=pltdata.groupby(['State', 'Description']).Combined.plot(legend=True, marker='o', markersize=3)
+    _=dense_panel(pltdata, ['State', 'Description'], 'Combined').plot(legend=True, marker='o', markersize=3)
     _=plt.legend(ncol=2)
     
     
@@ -287,4 +354,29 @@ def plot_milkproduction(data, style='ggplot'):
     
     
     
-    
\ No newline at end of file
+    
+
+
+
+############################## MARS EPHEMERIS ##############################
+# Observations from 1600 onwards, before the range of `pd.Timestamp`, indexed by daily periods
+def process_marshorizons(path):
+    return HorizonsReader(path, columns=['RA', 'Declination'], period_freq='D').read()
+
+def plot_marshorizons(data, style='ggplot'):
+    plt.rcParams['figure.dpi'] = 100
+    plt.rcParams['figure.figsize'] = (15,7)
+    plt.style.use(style)
+    _=data.Declination.plot(title='Mars Declination, JPL Horizons (Weekly)')
+    _=plt.ylabel('Declination (degrees)')
+
+
+def process_marsjpl(path):
+    return ChunkedReader(path, columns=['Declination'], time_col='Date', period_freq='D').read()
+
+def plot_marsjpl(data, style='ggplot'):
+    plt.rcParams['figure.dpi'] = 100
+    plt.rcParams['figure.figsize'] = (15,7)
+    plt.style.use(style)
+    _=data.Declination.plot(title='Mars Declination, JPL (Weekly)')
+    _=plt.ylabel('Declination (degrees)')
@@ -0,0 +1,56 @@
+import sys
+import importlib
+
+############################## LAZY IMPORTS ##############################
+# Plotting, statistics & notebook-only dependencies are imported on their first use,
+# so that `import helperhandler` stays cheap, e.g in batch workers only running `ro_framework`.
+
+
+class LazyModule:
+    '''
+    Stand-in for the module `name`, imported on the first attribute access.
+    `on_load` is called with the module once it is imported.
+    '''
+    def __init__(self, name, on_load=None):
+        self._name, self._on_load, self._module = name, on_load, None
+        if name in sys.modules:
+            # Already imported elsewhere, nothing to save
+            self._load()
+
+    def _load(self):
+        if self._module is None:
+            module = importlib.import_module(self._name)
+            if self._on_load is not None:
+                self._on_load(module)
+            self._module = module
+        return self._module
+
+    def __getattr__(self, attr):
+        if attr in ('_name', '_on_load', '_module'):
+            # Not initialised (e.g while copying), do not recurse into `_load`
+            raise AttributeError(attr)
+        return getattr(self._load(), attr)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self):
+        return "<lazy module '{0}' ({1})>".format(self._name, 'loaded' if self._module else 'not loaded')
+
+
+def lazy_callable(module_name, name, on_load=None):
+    # Function (or class) `module_name.name`, imported on its first call
+    _module = LazyModule(module_name, on_load=on_load)
+    def _call(*args, **kwargs):
+        return getattr(_module, name)(*args, **kwargs)
+    _call.__name__ = _call.__qualname__ = name
+    return _call
+
+
+def tqdm(*args, **kwargs):
+    # Notebook progress widgets inside a Jupyter kernel, text progress bars anywhere else
+    if 'ipykernel' in sys.modules:
+        from tqdm.notebook import tqdm as _tqdm
+    else:
+        from tqdm import tqdm as _tqdm
+    return _tqdm(*args, **kwargs)
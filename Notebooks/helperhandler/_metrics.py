@@ -0,0 +1,131 @@
+import numpy as np
+
+############################## METRIC REGISTRY ##############################
+# Every metric is computed point-wise over whole arrays (1-D for a roll, 2-D for
+# origin x horizon sheets) and then reduced to the overall number by its `agg`.
+# Point-wise functions get the actuals, the forecasts and a context dict holding
+# 'lower'/'upper' (forecast intervals), 'scale' (MASE) & 'q' (pinball), as available.
+_metric_registry = {}
+
+
+def register_metric(name, func, agg=None, needs=(), running=None):
+    """
+    Register a metric under `name`.
+    func    - point-wise metric, `func(y, yhat, ctx)` -> array shaped like `y`
+    agg     - reduction of the point-wise values along the origins, `agg(values, axis=0)`,
+              defaults to the NaN-ignoring mean
+    needs   - extra inputs required in `ctx`, any of ('interval', 'scale')
+    running - (transform, finish) such that `agg(values) == finish(nanmean(transform(values)))`,
+              lets `RunningAggregate` update `agg` in O(1) per point. Implied when `agg` is not given.
+    """
+    if agg is None and running is None:
+        running = (_identity, _identity)
+    _metric_registry[name] = {'func': func, 'agg': agg or np.nanmean, 'needs': tuple(needs),
+                              'running': running}
+
+
+def get_metrics(metric):
+    # Accept a single name or a list of names
+    metrics = [metric] if isinstance(metric, str) else list(metric)
+    unknown = [k for k in metrics if k not in _metric_registry]
+    if unknown or not metrics:
+        raise ValueError(f"'metric' should be one or more of {list(_metric_registry)}, got {unknown or metric}")
+    return metrics
+
+
+def metrics_need(metrics, need):
+    return any(need in _metric_registry[k]['needs'] for k in metrics)
+
+
+def compute_metrics(metrics, y, yhat, ctx=None):
+    ctx = ctx or {}
+    y, yhat = np.asarray(y, dtype=np.float64), np.asarray(yhat, dtype=np.float64)
+    return {k: _metric_registry[k]['func'](y, yhat, ctx) for k in metrics}
+
+
+def aggregate_metric(metric, values):
+    values = np.asarray(values, dtype=np.float64)
+    if values.shape[0] == 0:
+        return np.full(values.shape[1:], np.nan) if values.ndim > 1 else np.nan
+    return _metric_registry[metric]['agg'](values, axis=0)
+
+
+class RunningAggregate:
+    '''
+    Running value of a metric's `agg` over a growing set of point-wise values, from a running
+    (NaN-ignoring) sum & count. Metrics registered without a `running` form keep their values
+    and re-aggregate them instead.
+    '''
+    def __init__(self, metric):
+        self.metric = metric
+        self._running = _metric_registry[metric]['running']
+        self.total, self.count = 0.0, 0
+        self._values = []
+
+    def update(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        if self._running is None:
+            self._values.append(values)
+            return
+        values = self._running[0](values)
+        _valid = ~np.isnan(values)
+        self.total = self.total+np.where(_valid, values, 0).sum(axis=0)
+        self.count = self.count+_valid.sum(axis=0)
+
+    @property
+    def value(self):
+        if self._running is None:
+            return aggregate_metric(self.metric, np.concatenate(self._values)) if self._values else np.nan
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return self._running[1](self.total/self.count)
+
+
+def seasonal_naive_scale(y, m=1):
+    # In-sample MAE of the seasonal naive forecast, the MASE denominator
+    y = np.asarray(y, dtype=np.float64)
+    return np.nanmean(np.abs(y[m:]-y[:-m]))
+
+
+
+############################## METRICS ##############################
+def _identity(values):
+    return values
+
+def _mape(y, yhat, ctx):
+    return np.round(np.abs((y-yhat)/y)*100, 2)
+
+def _smape(y, yhat, ctx):
+    return np.round(np.abs(y-yhat)/(np.abs(y)+np.abs(yhat))*200, 2)
+
+def _mse(y, yhat, ctx):
+    return np.round((y-yhat)**2, 2)
+
+def _abs_error(y, yhat, ctx):
+    return np.round(np.abs(y-yhat), 2)
+
+def _rmse_agg(values, axis=0):
+    return np.sqrt(np.nanmean(values**2, axis=axis))
+
+def _mase(y, yhat, ctx):
+    return np.round(np.abs(y-yhat)/ctx['scale'], 2)
+
+def _pinball(y, yhat, ctx):
+    q = ctx.get('q', 0.5)
+    err = y-yhat
+    return np.round(np.maximum(q*err, (q-1)*err), 2)
+
+def _coverage(y, yhat, ctx):
+    # 100 when the actual falls inside the forecast interval, so the mean is a percentage
+    lower, upper = ctx['lower'], ctx['upper']
+    cov = ((y >= lower) & (y <= upper))*100.0
+    return np.where(np.isnan(y) | np.isnan(lower) | np.isnan(upper), np.nan, cov)
+
+
+register_metric('MAPE', _mape)
+register_metric('sMAPE', _smape)
+register_metric('MSE', _mse)
+register_metric('RMSE', _abs_error, agg=_rmse_agg, running=(np.square, np.sqrt))
+register_metric('MAE', _abs_error)
+register_metric('MASE', _mase, needs=('scale',))
+register_metric('Pinball', _pinball)
+register_metric('Coverage', _coverage, needs=('interval',))
@@ -0,0 +1,133 @@
+import os
+import json
+import shutil
+import hashlib
+import inspect
+import functools
+import numpy as np
+import pandas as pd
+
+############################## PREPARED DATA CACHE ##############################
+# A processed frame is stored as one directory holding a `.npy` file per column
+# (plus the index) and a `meta.json`. Plain `.npy` keeps the columns binary and
+# memory-mappable (`np.load(..., mmap_mode='r')`) without any extra dependency.
+# String/object columns are stored as integer codes + their categories (with their name & order),
+# periods as their ordinals.
+_format_version = 2
+# Bumped whenever the loaders' output changes in a way their source does not show (e.g a
+# library upgrade changing the parsing), invalidates every prepared copy
+PREPARED_VERSION = 1
+# The loaders' helpers, any change in them invalidates the prepared copies too
+_helper_modules = ['_individual_funcs.py', '_readers.py']
+
+
+def prepared_signature(raw_datapath, processing_func):
+    # Invalidated by any change in the raw file, in the processing function or in the helpers it calls
+    _stat = os.stat(raw_datapath)
+    try:
+        _func_src = inspect.getsource(processing_func)
+    except (OSError, TypeError):
+        _func_src = processing_func.__code__.co_code.hex()
+    _hash = hashlib.sha1()
+    for _part in (_format_version, PREPARED_VERSION, os.path.abspath(raw_datapath), _stat.st_mtime_ns,
+                  _stat.st_size, _func_src, _helpers_source()):
+        _hash.update(str(_part).encode())
+    return _hash.hexdigest()
+
+
+@functools.lru_cache(maxsize=None)
+def _helpers_source():
+    _dir = os.path.dirname(os.path.abspath(__file__))
+    _sources = []
+    for _name in _helper_modules:
+        with open(os.path.join(_dir, _name), encoding='utf-8') as f:
+            _sources.append(f.read())
+    return '\n'.join(_sources)
+
+
+def read_prepared(prepared_path, signature):
+    _meta_path = os.path.join(prepared_path, 'meta.json')
+    if not os.path.exists(_meta_path):
+        return None
+    try:
+        with open(_meta_path) as f:
+            meta = json.load(f)
+        if meta['signature'] != signature:
+            return None
+        columns = {e['name']: _read_array(prepared_path, e) for e in meta['columns']}
+        index = _read_array(prepared_path, meta['index'])
+    except (OSError, ValueError, KeyError):
+        # Corrupt or half-written cache, re-process
+        return None
+
+    data = pd.DataFrame(columns, index=pd.Index(index, name=meta['index']['name']))
+    data = data[[e['name'] for e in meta['columns']]]
+    if meta['index']['freq'] and not isinstance(data.index, pd.PeriodIndex):
+        # Periods carry their frequency in their dtype
+        data.index.freq = meta['index']['freq']
+    return data
+
+
+def write_prepared(prepared_path, signature, data):
+    # Only flat frames with simple dtypes are cached, anything else is silently re-processed every time
+    if isinstance(data.index, pd.MultiIndex) or isinstance(data.columns, pd.MultiIndex):
+        return False
+    if data.columns.duplicated().any():
+        return False
+
+    _tmp_path = prepared_path+'.{}.tmp'.format(os.getpid())
+    shutil.rmtree(_tmp_path, ignore_errors=True)
+    os.makedirs(_tmp_path)
+    try:
+        meta = {'signature': signature, 'columns': []}
+        for i, col in enumerate(data.columns):
+            meta['columns'].append(_write_array(_tmp_path, 'col_{}'.format(i), col, data[col]))
+        meta['index'] = _write_array(_tmp_path, 'index', data.index.name, data.index.to_series())
+        meta['index']['freq'] = getattr(data.index, 'freqstr', None)
+        with open(os.path.join(_tmp_path, 'meta.json'), 'w') as f:
+            json.dump(meta, f)
+    except (TypeError, ValueError):
+        shutil.rmtree(_tmp_path, ignore_errors=True)
+        return False
+
+    shutil.rmtree(prepared_path, ignore_errors=True)
+    os.replace(_tmp_path, prepared_path)
+    return True
+
+
+def _write_array(path, fname, name, series):
+    if not (name is None or isinstance(name, (str, int, float))):
+        raise TypeError('Unsupported column name')
+    entry = {'name': name, 'file': fname+'.npy', 'kind': 'array'}
+    if isinstance(series.dtype, pd.CategoricalDtype) or series.dtype == object:
+        # Strings -> integer codes + categories
+        entry['kind'] = 'category' if isinstance(series.dtype, pd.CategoricalDtype) else 'object'
+        _cat = pd.Categorical(series)
+        values = _cat.codes
+        entry['categories'] = _cat.categories.tolist()
+        entry['categories_name'] = _cat.categories.name
+        entry['ordered'] = bool(_cat.ordered)
+        json.dumps([entry['categories'], entry['categories_name']])
+    elif isinstance(series.dtype, pd.PeriodDtype):
+        entry['kind'] = 'period'
+        entry['freq'] = series.dtype.freq.freqstr
+        values = series.array.asi8
+    elif series.dtype.kind in 'biufcM' and not getattr(series.dtype, 'tz', None):
+        values = series.values
+    else:
+        raise TypeError('Unsupported dtype {}'.format(series.dtype))
+    np.save(os.path.join(path, entry['file']), values, allow_pickle=False)
+    return entry
+
+
+def _read_array(path, entry):
+    values = np.load(os.path.join(path, entry['file']), allow_pickle=False)
+    if entry['kind'] == 'array':
+        return values
+    if entry['kind'] == 'period':
+        return pd.PeriodIndex(ordinal=values, freq=entry['freq']).array
+    _categories = pd.Index(entry['categories'], name=entry.get('categories_name'))
+    _cat = pd.Categorical.from_codes(values, categories=_categories, ordered=entry['ordered'])
+    if entry['kind'] == 'object':
+        return np.asarray(_cat, dtype=object)
+    return _cat
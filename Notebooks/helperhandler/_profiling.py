@@ -0,0 +1,132 @@
+import sys
+import time
+import tracemalloc
+import numpy as np
+import pandas as pd
+try:
+    import resource
+except ImportError:
+    # Not available on Windows
+    resource = None
+
+
+############################## BACKTEST PROFILING ##############################
+_phases = ['Prep', 'Fit', 'Predict', 'Metric']
+
+
+class OriginProfiler:
+    '''
+    Per-origin timings of `ro_framework(profile=OriginProfiler())` - wall & CPU seconds of the
+    data-prep, fit & predict phases of every origin, optimizer iterations (where the fitted model
+    exposes them) & the peak memory, read with `to_frame()` after the backtest. Metrics are
+    computed once per roll (vectorized), so the metric phase is a row of its own per roll, at
+    `Origin` NaT.
+       `callback` is called with every record (a dict) as it is produced, origins fitted in
+    worker processes are passed on as their chunk completes. With `trace_memory` the peak
+    traced allocations of every origin are measured too (slow, `tracemalloc`), otherwise only
+    the peak resident size of the process is.
+    '''
+    def __init__(self, callback=None, trace_memory=False):
+        self.callback = callback
+        self.trace_memory = trace_memory
+        self.records = []
+        self.keys = {}
+
+    def add(self, record):
+        record = dict(self.keys, **record)
+        self.records.append(record)
+        if self.callback is not None:
+            self.callback(record)
+
+    def extend(self, records):
+        # Records of a `detached` copy, already keyed
+        for record in records:
+            self.records.append(record)
+            if self.callback is not None:
+                self.callback(record)
+
+    def detached(self):
+        # An empty copy without the callback, for worker processes
+        profiler = OriginProfiler(trace_memory=self.trace_memory)
+        profiler.keys = dict(self.keys)
+        return profiler
+
+    def timer(self):
+        return _OriginTimer(self.trace_memory)
+
+    def start_tracing(self):
+        # Memory tracing for a chunk of origins, True if started here (& so to be stopped after it)
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            return True
+        return False
+
+    def stop_tracing(self):
+        tracemalloc.stop()
+
+    def to_frame(self):
+        timings = pd.DataFrame(self.records)
+        if timings.empty:
+            return timings
+        _index = [k for k in ('Series', 'Roll', 'Origin') if k in timings.columns]
+        _columns = [f'{k} {t}' for k in _phases for t in ('Wall', 'CPU')]
+        _columns += ['Refit', 'Cached', 'Iterations', 'Max RSS MB', 'Peak Traced MB']
+        return timings.set_index(_index).reindex(columns=[k for k in _columns if k in timings.columns])
+
+
+class _OriginTimer:
+    # Wall & CPU time of consecutive phases, `mark` closes the running phase
+    def __init__(self, trace_memory=False):
+        self.record = {}
+        self._trace = trace_memory and tracemalloc.is_tracing()
+        if self._trace:
+            tracemalloc.reset_peak()
+        self._wall, self._cpu = time.perf_counter(), time.process_time()
+
+    def mark(self, phase):
+        _wall, _cpu = time.perf_counter(), time.process_time()
+        self.record[phase+' Wall'] = self.record.get(phase+' Wall', 0.0)+_wall-self._wall
+        self.record[phase+' CPU'] = self.record.get(phase+' CPU', 0.0)+_cpu-self._cpu
+        self._wall, self._cpu = _wall, _cpu
+
+    def note(self, **values):
+        self.record.update(values)
+
+    def finish(self, fitted_model=None):
+        self.record['Iterations'] = _iterations(fitted_model)
+        self.record['Max RSS MB'] = _max_rss_mb()
+        if self._trace:
+            self.record['Peak Traced MB'] = tracemalloc.get_traced_memory()[1]/1024**2
+        return self.record
+
+
+class _NullTimer:
+    # Stands in for the timer when profiling is off
+    def mark(self, phase):
+        pass
+
+    def note(self, **values):
+        pass
+
+
+_null_timer = _NullTimer()
+
+
+def _iterations(fitted_model):
+    # statsmodels MLE results & scikit-learn iterative estimators report their iterations
+    _retvals = getattr(fitted_model, 'mle_retvals', None)
+    if isinstance(_retvals, dict) and 'iterations' in _retvals:
+        return _retvals['iterations']
+    _estimator = getattr(fitted_model, '_final_estimator', fitted_model)
+    _n_iter = getattr(_estimator, 'n_iter_', None)
+    if _n_iter is not None:
+        return int(np.max(_n_iter))
+    return np.nan
+
+
+def _max_rss_mb():
+    if resource is None:
+        return np.nan
+    _rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Bytes on macOS, kilobytes elsewhere
+    return _rss/1024**2 if sys.platform == 'darwin' else _rss/1024
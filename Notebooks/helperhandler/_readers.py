@@ -0,0 +1,153 @@
+import numpy as np
+import pandas as pd
+
+############################## CHUNKED READERS ##############################
+# Large text exports are parsed in chunks of rows, keeping only the requested columns,
+# so that the memory use stays bounded by the chunk size & the (float32) output.
+_period_units = {'D': 'D', 'H': 'h', 'T': 'm', 'min': 'm', 'S': 's', 's': 's'}
+_month_numbers = {'Jan': '01', 'Feb': '02', 'Mar': '03', 'Apr': '04', 'May': '05', 'Jun': '06',
+                  'Jul': '07', 'Aug': '08', 'Sep': '09', 'Oct': '10', 'Nov': '11', 'Dec': '12'}
+
+
+class ChunkedReader:
+    '''
+    Streams a delimited text export (csv by default) in chunks of `chunksize` rows. Only
+    `columns` are parsed, as `dtype` (float32) columns indexed by the parsed `time_col`.
+    Iterating yields one frame per chunk, `read()` concatenates them.
+       Timestamps outside the range of pandas' datetimes (1677 to 2262) need `period_freq`,
+    the index then holds periods of that frequency ('D', 'H', 'min' or 's').
+    Any other `read_kwargs` are passed on to `pd.read_csv` (sep, compression, ...).
+    '''
+    def __init__(self, path, columns, time_col, chunksize=100_000, time_format=None, period_freq=None,
+                 dtype=np.float32, **read_kwargs):
+        if period_freq is not None and period_freq not in _period_units:
+            raise ValueError(f"'period_freq' should be one of {list(_period_units)}")
+        if type(chunksize) != int or chunksize <= 0:
+            raise ValueError("'chunksize' should be a positive `int`")
+        self.path = path
+        self.columns = list(columns)
+        self.time_col = time_col
+        self.chunksize = chunksize
+        self.time_format = time_format
+        self.period_freq = period_freq
+        self.dtype = dtype
+        self.read_kwargs = read_kwargs
+
+    def __iter__(self):
+        for raw in self._raw_chunks():
+            yield self._convert(raw, raw[self.time_col])
+
+    def read(self):
+        chunks = list(self)
+        if not chunks:
+            return pd.DataFrame(columns=self.columns, dtype=self.dtype)
+        return pd.concat(chunks)
+
+    def _raw_chunks(self):
+        return pd.read_csv(self.path, usecols=[self.time_col]+self.columns, chunksize=self.chunksize,
+                           dtype={k: self.dtype for k in self.columns}, **self.read_kwargs)
+
+    def _convert(self, values, times):
+        # `values` - columns (or 1d arrays) of the chunk, `times` - its timestamps as text
+        return pd.DataFrame({k: np.asarray(values[k], dtype=self.dtype) for k in self.columns},
+                            index=self._time_index(times))
+
+    def _time_index(self, times):
+        if self.period_freq is None:
+            try:
+                return pd.DatetimeIndex(pd.to_datetime(times, format=self.time_format), name=self.time_col)
+            except pd.errors.OutOfBoundsDatetime:
+                raise ValueError(f"Timestamps of '{self.path}' are outside the range of `pd.Timestamp`, "
+                                 "index them by periods with `period_freq`")
+        # ISO timestamps are parsed by numpy, at the unit of the periods
+        _ordinals = np.asarray(times, dtype=object).astype(f'datetime64[{_period_units[self.period_freq]}]')
+        return pd.PeriodIndex(ordinal=_ordinals.astype(np.int64), freq=self.period_freq, name=self.time_col)
+
+
+class HorizonsReader(ChunkedReader):
+    '''
+    JPL Horizons observer table export - the whitespace separated rows between `$$SOE` &
+    `$$EOE`, streamed line by line. `columns` out of `HorizonsReader.quantities`, RA & DEC
+    are converted from sexagesimal to decimal hours & degrees. The row layout is the one of
+    the export in `Raw Data` (RA/DEC, APmag/S-brt, delta/deldot, S-O-T /r, S-T-O).
+    '''
+    _fields = ['Date', 'Time', 'RA_1', 'RA_2', 'RA_3', 'DEC_1', 'DEC_2', 'DEC_3',
+               'APmag', 'S-brt', 'delta', 'deldot', 'S-O-T', '/r', 'S-T-O']
+    quantities = ['RA', 'Declination', 'APmag', 'S-brt', 'delta', 'deldot', 'S-O-T', 'S-T-O']
+    # Quantities spread over 3 sexagesimal fields
+    _sexagesimal_fields = {'RA': 'RA', 'Declination': 'DEC'}
+
+    def __init__(self, path, columns=None, chunksize=100_000, period_freq=None, dtype=np.float32):
+        columns = self.quantities if columns is None else list(columns)
+        unknown = [k for k in columns if k not in self.quantities]
+        if unknown:
+            raise ValueError(f"{unknown} not available, Horizons columns are {self.quantities}")
+        super().__init__(path, columns, 'Date', chunksize, period_freq=period_freq, dtype=dtype)
+
+    def __iter__(self):
+        for raw in self._raw_chunks():
+            # '1600-Jan-02', '00:00' -> '1600-01-02 00:00'
+            _date = raw['Date']
+            _times = _date.str[:5]+_date.str[5:8].map(_month_numbers)+_date.str[8:]+' '+raw['Time']
+            _values = {}
+            for k in self.columns:
+                if k in self._sexagesimal_fields:
+                    _prefix = self._sexagesimal_fields[k]
+                    _values[k] = _sexagesimal(*[raw[f'{_prefix}_{i}'] for i in (1, 2, 3)])
+                else:
+                    _values[k] = raw[k]
+            yield self._convert(_values, _times)
+
+    def _raw_chunks(self):
+        _usecols = ['Date', 'Time']
+        for k in self.columns:
+            if k in self._sexagesimal_fields:
+                _usecols += [f'{self._sexagesimal_fields[k]}_{i}' for i in (1, 2, 3)]
+            else:
+                _usecols.append(k)
+        _dtype = {k: (str if k in ('Date', 'Time', 'RA_1', 'DEC_1') else np.float64) for k in _usecols}
+        # Text mode reads the '\r' line ends of some exports as line ends too
+        with open(self.path) as f:
+            yield from pd.read_csv(_BlockStream(f, '$$SOE', '$$EOE'), delim_whitespace=True, header=None,
+                                   names=self._fields, usecols=_usecols, dtype=_dtype, na_values=['n.a.'],
+                                   chunksize=self.chunksize)
+
+
+class _BlockStream:
+    # File-like view of the lines between the `start` & `end` markers, read lazily by `pd.read_csv`
+    def __init__(self, f, start, end):
+        self._lines = self._block(f, start, end)
+        self._buffer = ''
+
+    @staticmethod
+    def _block(f, start, end):
+        for line in f:
+            if line.startswith(start):
+                break
+        for line in f:
+            if line.startswith(end):
+                return
+            yield line
+
+    def read(self, size=-1):
+        _parts, _size = [self._buffer], len(self._buffer)
+        for line in self._lines:
+            _parts.append(line)
+            _size += len(line)
+            if 0 <= size <= _size:
+                break
+        _text = ''.join(_parts)
+        if size < 0:
+            size = len(_text)
+        self._buffer = _text[size:]
+        return _text[:size]
+
+    def __iter__(self):
+        # Only checked for by pandas, which reads through `read`
+        return self._lines
+
+
+def _sexagesimal(units, minutes, seconds):
+    # ('+DD', MM, SS.s) -> decimal, the sign is read from the text as '-00 30 00' is negative too
+    _sign = np.where(units.str.startswith('-', na=False), -1.0, 1.0)
+    return _sign*(np.abs(units.astype(np.float64))+minutes/60+seconds/3600)